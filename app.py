@@ -4,32 +4,68 @@
 
 from __future__ import annotations
 
+import copy
 import json
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from paid_runners_bot import run_scan_for_modes
 
+try:  # optional: orjson parses/serializes straight from/to UTF-8 bytes, several times faster
+    import orjson
+
+    def _loads(b: bytes) -> Any:
+        return orjson.loads(b)
+
+    def _dumps(o: Any) -> bytes:
+        return orjson.dumps(o, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _loads(b: bytes) -> Any:
+        return json.loads(b)
+
+    def _dumps(o: Any) -> bytes:
+        return json.dumps(o, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 APP_TITLE = "Scanner de runners - Dexscreener / Solana"
 CONFIG_PATH = Path(__file__).with_name("scanner_config.json")
 
 
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_config_cached(mtime: float, path: str) -> Dict[str, Any]:
+    # mtime is only part of the cache key: a rewrite of the file invalidates the entry. Each
+    # save makes a new key, hence max_entries: only the current file (and the previous) stay.
+    try:
+        return _loads(Path(path).read_bytes())
+    except Exception:
+        return {}
+
+
+def _config_mtime() -> float:
+    return CONFIG_PATH.stat().st_mtime if CONFIG_PATH.exists() else 0.0
+
+
 def load_config() -> Dict[str, Any]:
-    if CONFIG_PATH.exists():
-        try:
-            return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+    mtime = _config_mtime()
+    if not mtime:
+        return {}
+    return _load_config_cached(mtime, str(CONFIG_PATH))
 
 
 def save_config(cfg: Dict[str, Any]) -> None:
     try:
-        CONFIG_PATH.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding="utf-8")
+        CONFIG_PATH.write_bytes(_dumps(cfg))
     except Exception:
         pass
 
@@ -39,25 +75,112 @@ def _serialize_config(cfg: Dict[str, Any]) -> str:
         return json.dumps(cfg, ensure_ascii=False, sort_keys=True)
     except Exception:
         return ""
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _config_hash_cached(mtime: float, path: str) -> int:
+    # Keyed and bounded like _load_config_cached: recomputed only when the file changes.
+    return hash(_serialize_config(_load_config_cached(mtime, path)))
+
+
+def save_config_if_changed(cfg: Dict[str, Any]) -> bool:
+    """Write cfg only when it differs from what is on disk now (which another session may have changed)."""
+    mtime = _config_mtime()
+    disk_hash = _config_hash_cached(mtime, str(CONFIG_PATH)) if mtime else hash(_serialize_config({}))
+    if hash(_serialize_config(cfg)) == disk_hash:
+        return False
+    save_config(cfg)
+    return True
+
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    # Shared across reruns and sessions so the connection pool survives widget clicks.
+    s = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),  # getBalance is read-only, safe to retry
+        raise_on_status=False,
+    )
+    s.mount("https://", HTTPAdapter(max_retries=retry))
+    return s
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@lru_cache(maxsize=32)
+def _rpc_body(wallet: str) -> bytes:
+    # Pre-encoded getBalance request: the same wallet is polled over and over.
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": [wallet]}).encode("utf-8")
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _cached_get_balance(wallet: str, rpc_url: str, timeout_s: int = 12) -> float:
+    # Failures raise instead of returning None: st.cache_data does not cache exceptions, so a
+    # transient RPC error (or 429) is retried on the next rerun instead of replayed for 15 s.
+    sess = _http_session()
+    r = sess.post(rpc_url, data=_rpc_body(wallet), headers=_JSON_HEADERS, timeout=timeout_s)
+    r.raise_for_status()
+    data = r.json() or {}
+    lamports = (data.get("result") or {}).get("value")
+    if lamports is None:
+        raise ValueError(f"getBalance: no result ({data.get('error')!r})")
+    return float(lamports) / 1_000_000_000.0
 
 
 def solana_get_balance(wallet: str, rpc_url: str, timeout_s: int = 12) -> Optional[float]:
     wallet = (wallet or "").strip()
     if not wallet:
         return None
-    payload = {"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": [wallet]}
     try:
-        r = requests.post(rpc_url, json=payload, timeout=timeout_s)
-        r.raise_for_status()
-        data = r.json() or {}
-        lamports = (data.get("result") or {}).get("value")
-        if lamports is None:
-            return None
-        return float(lamports) / 1_000_000_000.0
+        return _cached_get_balance(wallet, rpc_url, timeout_s)
     except Exception:
         return None
 
 
+SCAN_CACHE_TTL_S = 60.0
+
+ScanKey = Tuple[Tuple[str, Any], ...]
+ScanResult = Tuple[List[Dict[str, Any]], Dict[str, Any]]
+
+
+@st.cache_resource
+def _scan_cache() -> Tuple[Dict[ScanKey, Tuple[float, ScanResult]], threading.Lock]:
+    # Shared by all sessions (and their script threads), hence the lock. Not st.cache_data: the
+    # progress callback writes to widgets created outside the cached call, which Streamlit
+    # cannot replay on a cache hit.
+    return {}, threading.Lock()
+
+
+def _clear_scan_cache() -> None:
+    cache, lock = _scan_cache()
+    with lock:
+        cache.clear()
+
+
+def _cached_scan(params_key: ScanKey, progress_callback: Optional[Any] = None) -> ScanResult:
+    cache, lock = _scan_cache()
+    now = time.monotonic()
+    with lock:
+        for k in [k for k, (ts, _) in cache.items() if now - ts >= SCAN_CACHE_TTL_S]:
+            del cache[k]
+        hit = cache.get(params_key)
+    # Stored results are never mutated, so copying them outside the lock is safe
+    if hit is not None:
+        return copy.deepcopy(hit[1])
+
+    # The scan itself runs unlocked: other sessions keep reading the cache meanwhile
+    params = dict(params_key)
+    params["selected_modes"] = list(params["selected_modes"])
+    result = run_scan_for_modes(**params, progress_callback=progress_callback)
+    with lock:
+        cache[params_key] = (now, result)
+    return copy.deepcopy(result)
+
+
 _STYLES = """
 <style>
 /* Soft card look for controls */
@@ -140,12 +263,110 @@ def _render_external_link(label: str, url: str) -> None:
     )
 
 
+# Display order of the results table (remaining columns follow in scan order)
+PREFERRED_COLS = (
+    "mode", "symbol", "name", "score",
+    "spike_score", "tokenAddress", "source", "pairAddress",
+    "priceUsd", "marketCap", "fdv", "liquidityUsd",
+    "vol5m", "vol1h", "vol24h",
+    "buys5m", "sells5m", "netBuy5m",
+    "m5pct", "h1pct", "h6pct", "h24pct",
+    "ageMin", "dexId",
+    "boostAmount", "boostTotal", "boostType",
+    "isCTO",
+    "profileUrl", "profileLinksCount", "profileDescription",
+    "urlDexscreener", "urlGMGN",
+)
+_PREFERRED_SET = frozenset(PREFERRED_COLS)
+
+# Typed columns for st.dataframe: contiguous float64 / Arrow string buffers serialize smaller and
+# faster than object arrays. float64 (not float32) so USD amounts display exactly; missing or
+# unparseable cells stay NaN and show blank. priceUsd stays as the API string: microcap prices
+# would display as 0.
+NUM_COLS = frozenset({
+    "marketCap", "fdv", "liquidityUsd",
+    "vol5m", "vol1h", "vol24h",
+    "m5pct", "h1pct", "h6pct", "h24pct",
+    "ageMin", "spike_score", "score",
+    "boostAmount", "boostTotal",
+})
+STR_COLS = frozenset({
+    "mode", "symbol", "name", "tokenAddress", "source", "pairAddress", "dexId", "boostType",
+    "urlDexscreener", "urlGMGN", "profileUrl", "profileDescription",
+})
+
+
+def _vec_safe_float(s: pd.Series, default: float = 0.0) -> pd.Series:
+    """
+    Column-wise float coercion: one vectorized pass instead of a try/except per value.
+    Thousands separators are stripped; unparseable values become `default`.
+    """
+    if not pd.api.types.is_numeric_dtype(s.dtype):
+        s = s.astype("string").str.strip().str.replace(",", "", regex=False)
+    return pd.to_numeric(s, errors="coerce").astype("float64").fillna(default)
+
+
+def _arrow_friendly(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for c in NUM_COLS.intersection(out.columns):
+        out[c] = _vec_safe_float(out[c], default=float("nan"))
+    for c in STR_COLS.intersection(out.columns):
+        out[c] = out[c].astype("string[pyarrow]")
+    return out
+
+
+VIEW_PAGE_ROWS = 50
+
+
+def _extend_view_cap(limit: int) -> None:
+    # on_click callback: runs before the rerun, so the table is rendered with the new window.
+    st.session_state["_view_cap"] = min(limit, st.session_state.get("_view_cap", VIEW_PAGE_ROWS) + VIEW_PAGE_ROWS)
+
+
+def _str_col(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype="string")
+    return df[col].astype("string").fillna("")
+
+
+def _token_labels(df: pd.DataFrame) -> List[str]:
+    # One vectorized pass instead of iterrows() (which builds a Series per row).
+    labels = (
+        _str_col(df, "symbol")
+        + " - "
+        + _str_col(df, "name")
+        + " ("
+        + _str_col(df, "tokenAddress").str.slice(0, 6)
+        + "...)"
+    )
+    return labels.tolist()
+
+
+# Factories, not values: each browser session needs its own (mutable) list / DataFrame
+_SESSION_DEFAULTS = {
+    "last_scan_debug": lambda: None,
+    "last_scan_df": pd.DataFrame,
+    "token_blacklist_entries": list,
+    "last_balance": lambda: None,
+}
+
+
 def main() -> None:
     st.set_page_config(page_title=APP_TITLE, layout="wide")
     st.markdown(_STYLES, unsafe_allow_html=True)
 
     cfg = load_config()
-    cfg_serialized = _serialize_config(cfg)
+
+    # Config writes are coalesced: mutations only mark cfg dirty, one write happens at the end of the run
+    cfg_dirty = False
+
+    def _mark_dirty() -> None:
+        nonlocal cfg_dirty
+        cfg_dirty = True
+
+    def _flush_config() -> None:
+        if cfg_dirty:
+            save_config_if_changed(cfg)
 
     # Normalize / default new persisted settings
     if "token_blacklist" not in cfg:
@@ -157,12 +378,9 @@ def main() -> None:
         cfg["max_display_rows"] = int(cfg.get("max_rows", 200) or 200)
 
     # Session state holders
-    if "last_scan_debug" not in st.session_state:
-        st.session_state["last_scan_debug"] = None
-    if "last_scan_df" not in st.session_state:
-        st.session_state["last_scan_df"] = pd.DataFrame()
-    if "token_blacklist_entries" not in st.session_state:
-        st.session_state["token_blacklist_entries"] = []
+    for key, factory in _SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = factory()
 
     # Header
     col_h1, col_h2 = st.columns([3.8, 1], gap="large")
@@ -311,9 +529,16 @@ def main() -> None:
                 placeholder="Ex:\nGE5BJqTsVWfgv8qa6zQ6WFnLQGRATu3StN59kmTFpump",
                 key="token_blacklist_text",
             )
-            parsed = [line.strip() for line in (bl_text or "").splitlines() if line.strip()]
-            # De-dup while preserving order
-            parsed = list(dict.fromkeys(parsed))
+            # Re-parse only when the text changed (most reruns come from other widgets)
+            bl_hash = hash(bl_text or "")
+            cached = st.session_state.get("_bl_parse_cache")
+            if cached and cached[0] == bl_hash:
+                parsed = cached[1]
+            else:
+                # De-dup while preserving order
+                parsed = list(dict.fromkeys(line.strip() for line in (bl_text or "").splitlines() if line.strip()))
+                st.session_state["_bl_parse_cache"] = (bl_hash, parsed)
+                st.session_state["_blacklist_set"] = frozenset(x for x in parsed if x)
             st.session_state["token_blacklist_entries"] = parsed
             st.caption(f"{len(parsed)} entrée(s) dans la blacklist :")
             if parsed:
@@ -328,6 +553,8 @@ def main() -> None:
             if clear_bl:
                 token_blacklist = []
                 st.session_state["token_blacklist_entries"] = []
+                st.session_state["_blacklist_set"] = frozenset()
+                st.session_state.pop("_bl_parse_cache", None)
                 st.session_state["token_blacklist_text"] = ""
                 st.success("Blacklist vidée.")
             elif save_bl:
@@ -336,7 +563,15 @@ def main() -> None:
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.write("")  # spacing
-        scan_btn = st.button("Lancer un scan maintenant", type="primary", use_container_width=False)
+        col_scan1, col_scan2 = st.columns([1, 1])
+        with col_scan1:
+            scan_btn = st.button("Lancer un scan maintenant", type="primary", use_container_width=False)
+        with col_scan2:
+            force_scan_btn = st.button(
+                "Forcer un nouveau scan",
+                use_container_width=False,
+                help="Ignore le cache (60 s) des scans identiques et interroge de nouveau Dexscreener.",
+            )
 
     with right:
         st.markdown('<div class="right-card">', unsafe_allow_html=True)
@@ -397,22 +632,15 @@ def main() -> None:
     cfg_update["max_display_rows"] = int(max_display_rows) if "max_display_rows" in locals() else int(cfg.get("max_display_rows", 200))
 
     # Merge-save to avoid dropping unrelated keys
-    cfg = {**cfg, **cfg_update}
-    new_serialized = _serialize_config(cfg)
-    if new_serialized != cfg_serialized:
-        save_config(cfg)
-        cfg_serialized = new_serialized
-
-    if "last_scan_debug" not in st.session_state:
-        st.session_state["last_scan_debug"] = None
-    if "last_scan_df" not in st.session_state:
-        st.session_state["last_scan_df"] = pd.DataFrame()
+    if any(cfg.get(k) != v for k, v in cfg_update.items()):
+        cfg = {**cfg, **cfg_update}
+        _mark_dirty()
 
     # Progress UI placeholders (will be created when scan starts)
     progress_bar = None
     progress_status = None
 
-    if scan_btn:
+    if scan_btn or force_scan_btn:
         if not modes:
             st.warning("Sélectionne au moins un mode.")
         else:
@@ -421,63 +649,74 @@ def main() -> None:
                 progress_bar = st.progress(0)
                 progress_status = st.empty()
 
+                # Each widget write is a websocket round-trip: only push when the percentage
+                # moved and at least 100 ms have passed (the final tick always goes through).
+                last_push = {"pct": -1, "t": 0.0}
+
                 def _progress_cb(done: int, total: int) -> None:
                     try:
                         pct = int((done / max(1, total)) * 100)
                     except Exception:
                         pct = 0
+                    now = time.monotonic()
+                    if done < total and (pct == last_push["pct"] or (now - last_push["t"]) < 0.1):
+                        return
+                    last_push["pct"] = pct
+                    last_push["t"] = now
                     try:
                         progress_bar.progress(min(max(pct, 0), 100))
                         progress_status.text(f"Enrichissement DexScreener: {done}/{total} ({pct}%)")
                     except Exception:
                         pass
 
+                scan_params = {
+                    "selected_modes": tuple(modes),
+                    "top_n": int(top_n),
+                    "candidates_max": int(candidates_max),
+                    "anti_dead": bool(anti_dead),
+                    "include_boosts": bool(include_boosts),
+                    "include_profiles": bool(include_profiles),
+                    "include_cto": bool(include_cto),
+                    "include_ads": bool(include_ads),  # now drives inclusion of ads as candidates
+                    "include_orders": bool(include_orders),
+                    "unique_per_token": bool(unique_per_token),
+                    "trending_filters": bool(trending_filters),
+                    "trending_min_liquidity": float(trending_min_liq),
+                    "trending_min_vol1h": float(trending_min_vol1h),
+                    "trending_min_vol5m": float(trending_min_vol5m),
+                    "trending_min_netbuy5m": int(trending_min_netbuy5m),
+                    "verbose_debug": bool(verbose_debug),
+                    "pump_mode": bool(pump_mode),
+                    "sort_by_spike": bool(sort_by_spike),
+                }
+                if force_scan_btn:
+                    _clear_scan_cache()
+
                 with st.spinner("Lancement du scan - cela peut prendre quelques secondes..."):
-                    runners, debug = run_scan_for_modes(
-                        selected_modes=modes,
-                        top_n=int(top_n),
-                        candidates_max=int(candidates_max),
-                        anti_dead=bool(anti_dead),
-                        include_boosts=bool(include_boosts),
-                        include_profiles=bool(include_profiles),
-                        include_cto=bool(include_cto),
-                        include_ads=bool(include_ads),  # now drives inclusion of ads as candidates
-                        include_orders=bool(include_orders),
-                        unique_per_token=bool(unique_per_token),
-                        trending_filters=bool(trending_filters),
-                        trending_min_liquidity=float(trending_min_liq),
-                        trending_min_vol1h=float(trending_min_vol1h),
-                        trending_min_vol5m=float(trending_min_vol5m),
-                        trending_min_netbuy5m=int(trending_min_netbuy5m),
-                        verbose_debug=bool(verbose_debug),
-                        pump_mode=bool(pump_mode),
-                        sort_by_spike=bool(sort_by_spike),
-                        progress_callback=_progress_cb,
-                    )
+                    runners, debug = _cached_scan(tuple(sorted(scan_params.items())), _progress_cb)
                 # Post-scan: apply blacklist to the displayed results
-                blocked = set(
-                    [str(x).strip() for x in (st.session_state.get("token_blacklist_entries") or []) if str(x).strip()]
-                )
+                blocked = st.session_state.get("_blacklist_set", frozenset())
+                scan_df = pd.DataFrame(runners) if runners else pd.DataFrame()
                 removed = 0
-                if blocked and runners:
-                    before = len(runners)
-                    runners = [r for r in runners if str(r.get("tokenAddress", "")).strip() not in blocked]
-                    removed = before - len(runners)
+                if blocked and "tokenAddress" in scan_df.columns:
+                    mask = ~scan_df["tokenAddress"].astype("string").str.strip().isin(blocked)
+                    removed = int((~mask).sum())
+                    scan_df = scan_df[mask]
 
-                msg = f"Scan terminé - {len(runners)} résultat(s) trouvé(s)."
+                msg = f"Scan terminé - {len(scan_df)} résultat(s) trouvé(s)."
                 if removed:
                     msg += f" ({removed} masqué(s) via blacklist)"
                 st.success(msg)
 
                 st.session_state["last_scan_debug"] = debug
-                st.session_state["last_scan_df"] = pd.DataFrame(runners) if runners else pd.DataFrame()
+                st.session_state["last_scan_df"] = scan_df
+                st.session_state["_scan_id"] = st.session_state.get("_scan_id", 0) + 1
+                st.session_state["_view_cap"] = VIEW_PAGE_ROWS
+                st.session_state["_bl_applied_hash"] = hash((blocked, id(scan_df)))
 
                 # Persist last scan timestamp only on successful scan
                 cfg["last_scan_ts"] = pd.Timestamp.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-                new_serialized = _serialize_config(cfg)
-                if new_serialized != cfg_serialized:
-                    save_config(cfg)
-                    cfg_serialized = new_serialized
+                _mark_dirty()
 
             except Exception as e:
                 st.session_state["last_scan_debug"] = {"error": repr(e)}
@@ -499,12 +738,17 @@ def main() -> None:
 
     # Apply blacklist to the currently displayed dataframe (even without re-scanning)
     try:
-        blocked = set(
-            [str(x).strip() for x in (st.session_state.get("token_blacklist_entries") or []) if str(x).strip()]
-        )
-        if isinstance(df, pd.DataFrame) and (not df.empty) and blocked and ("tokenAddress" in df.columns):
-            df = df[~df["tokenAddress"].astype(str).str.strip().isin(blocked)].copy()
+        blocked = st.session_state.get("_blacklist_set", frozenset())
+        if (
+            isinstance(df, pd.DataFrame)
+            and (not df.empty)
+            and blocked
+            and ("tokenAddress" in df.columns)
+            and st.session_state.get("_bl_applied_hash") != hash((blocked, id(df)))
+        ):
+            df = df[~df["tokenAddress"].astype("string").str.strip().isin(blocked)]
             st.session_state["last_scan_df"] = df
+            st.session_state["_bl_applied_hash"] = hash((blocked, id(df)))
     except Exception:
         pass
 
@@ -517,51 +761,67 @@ def main() -> None:
 
     if df is None or df.empty:
         st.info("Aucun token ne passe les filtres pour les modes sélectionnés.")
+        _flush_config()
         return
 
     st.subheader(f"Top {min(len(df), int(top_n))} runners (tous modes confondus)")
 
-    preferred = [
-        "mode", "symbol", "name", "score",
-        "spike_score", "tokenAddress", "source", "pairAddress",
-        "priceUsd", "marketCap", "fdv", "liquidityUsd",
-        "vol5m", "vol1h", "vol24h",
-        "buys5m", "sells5m", "netBuy5m",
-        "m5pct", "h1pct", "h6pct", "h24pct",
-        "ageMin", "dexId",
-        "boostAmount", "boostTotal", "boostType",
-        "isCTO",
-        "profileUrl", "profileLinksCount", "profileDescription",
-        "urlDexscreener", "urlGMGN",
-    ]
-    cols = [c for c in preferred if c in df.columns] + [c for c in df.columns if c not in preferred]
-    df = df[cols]
+    # Column order only depends on the column set: recompute it when a scan brings new columns
+    cols_key = tuple(df.columns)
+    if st.session_state.get("_cols_key") != cols_key:
+        st.session_state["_cols_cache"] = (
+            [c for c in PREFERRED_COLS if c in df.columns] + [c for c in df.columns if c not in _PREFERRED_SET]
+        )
+        st.session_state["_cols_key"] = cols_key
+    cols = st.session_state["_cols_cache"]
 
     # Apply persisted column visibility (if configured)
-    vis = [c for c in (cfg.get("visible_columns") or []) if c in df.columns]
+    vis = set(c for c in (cfg.get("visible_columns") or []) if c in df.columns)
     if vis:
-        ordered_vis = [c for c in df.columns if c in vis]
-        df = df[ordered_vis]
+        cols = [c for c in cols if c in vis]
 
     # Apply display row cap (persisted)
     try:
         cap = int(cfg.get("max_display_rows", 200))
     except Exception:
         cap = 200
-    if cap > 0:
-        df = df.head(cap)
+
+    # Only ship the first rows of the capped result; "Charger plus" extends the window on demand.
+    total_rows = min(len(df), cap) if cap > 0 else len(df)
+    view_cap = min(total_rows, st.session_state.setdefault("_view_cap", VIEW_PAGE_ROWS))
+
+    # Resolve rows and columns on labels first, then slice the frame once: only the visible,
+    # projected block is materialized for the table. The selector labels below are built from
+    # the same rows with every column, so hiding symbol/name/tokenAddress doesn't blank them.
+    rows = df.iloc[:view_cap]
+    df = rows[cols]
 
     row_count = max(1, len(df))
     height = min(700, 60 + 35 * row_count)
-    st.dataframe(df, width="stretch", height=height)
+    st.dataframe(_arrow_friendly(df), width="stretch", height=height)
+    if view_cap < total_rows:
+        st.caption(f"{view_cap} / {total_rows} lignes affichées.")
+        st.button(
+            f"Charger {VIEW_PAGE_ROWS} lignes de plus",
+            key="load_more_rows",
+            on_click=_extend_view_cap,
+            args=(total_rows,),
+        )
 
     st.write("")
     st.subheader("Actions de trading rapides (GMGN)")
     st.caption("Ces boutons n'envoient aucune transaction. Ils ouvrent simplement la page GMGN ou Dexscreener correspondante.")
 
-    token_labels = []
-    for _, row in df.iterrows():
-        token_labels.append(f"{row.get('symbol','')} - {row.get('name','')} ({str(row.get('tokenAddress',''))[:6]}...)")
+    # Labels only change with the values they are built from: rebuild them once per new scan /
+    # page, not on every click
+    labels_key = (
+        st.session_state.get("_scan_id", 0),
+        *(tuple(_str_col(rows, c).tolist()) for c in ("tokenAddress", "symbol", "name")),
+    )
+    if st.session_state.get("_labels_key") != labels_key:
+        st.session_state["_labels"] = _token_labels(rows)
+        st.session_state["_labels_key"] = labels_key
+    token_labels = st.session_state["_labels"]
 
     idx = st.selectbox(
         "Choisis un token pour préparer un BUY / SELL (GMGN)",
@@ -584,9 +844,11 @@ def main() -> None:
                 if ca not in bl:
                     bl.append(ca)
                     st.session_state["token_blacklist_entries"] = bl
+                    st.session_state["_blacklist_set"] = frozenset(bl)
+                    st.session_state.pop("_bl_parse_cache", None)
                     st.session_state["token_blacklist_text"] = "\n".join(bl)
                     cfg["token_blacklist"] = bl
-                    save_config(cfg)
+                    _mark_dirty()
                 else:
                     st.info("Token déjà présent dans la blacklist.")
                 # Remove it from current displayed dataframe
@@ -610,6 +872,8 @@ def main() -> None:
         st.text_input("Dex (Dexscreener)", value=str(chosen.get("dexId", "")), disabled=True)
         _render_external_link("Voir sur Dexscreener", dexscreener_url)
 
+    _flush_config()
+
 
 if __name__ == "__main__":
     main()
@@ -13,17 +13,39 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+import heapq
 import json
 import math
+import random
+import threading
 import time
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:  # optional: orjson parses the response bytes directly, several times faster than json
+    import orjson
+
+    def _json_loads(b: bytes) -> Any:
+        try:
+            return orjson.loads(b)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (no NaN/Infinity, 64-bit ints only): give the stdlib a chance
+            return json.loads(b)
+
+except ImportError:
+
+    def _json_loads(b: bytes) -> Any:
+        return json.loads(b)
+
 
 DEX_BASE = "https://api.dexscreener.com"
 CHAIN_ID = "solana"
@@ -31,12 +53,29 @@ CHAIN_ID = "solana"
 DEFAULT_TIMEOUT_S = 12
 DEFAULT_USER_AGENT = "BotTrading/paid_runners_bot (contact: local)"
 
+# Concurrent HTTP calls per fan-out (pairs batches, ...)
+HTTP_MAX_WORKERS = 8
+# Smaller pool for the per-token /token-pairs/v1 fallback
+PAIRS_FALLBACK_WORKERS = 4
+# Keep-alive connections kept per host by the shared session: room for several concurrent
+# fan-outs (e.g. Streamlit sessions scanning at the same time)
+HTTP_POOL_MAXSIZE = 4 * HTTP_MAX_WORKERS
+
+# /tokens/v1 accepts at most 30 comma-separated addresses per call
+PAIRS_BATCH_MAX = 30
+
+# Shared read-only stand-in for missing sub-objects (`x.get(k) or _EMPTY`), avoids a new {} per access
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
 
 # =============================================================================
 # Helpers
 # =============================================================================
 
 def _safe_float(x: Any, default: float = 0.0) -> float:
+    # Fast path: most DexScreener numeric fields already arrive as floats.
+    if type(x) is float:
+        return x
     try:
         if x is None:
             return default
@@ -53,6 +92,8 @@ def _safe_float(x: Any, default: float = 0.0) -> float:
 
 
 def _safe_int(x: Any, default: int = 0) -> int:
+    if type(x) is int:
+        return x
     try:
         if x is None:
             return default
@@ -84,6 +125,16 @@ def _age_minutes_from_pair_created_at(pair_created_at: Any) -> float:
     return age_ms / 60000.0
 
 
+def _dedup_ci(items: Iterable[Optional[str]]) -> List[str]:
+    """Stripped, non-empty items, deduped case-insensitively; keeps the first spelling and the order."""
+    seen: Dict[str, str] = {}
+    for a in items:
+        aa = (a or "").strip()
+        if aa:
+            seen.setdefault(aa.lower(), aa)
+    return list(seen.values())
+
+
 def _chunks(items: List[str], n: int) -> Iterable[List[str]]:
     for i in range(0, len(items), n):
         yield items[i : i + n]
@@ -91,156 +142,364 @@ def _chunks(items: List[str], n: int) -> Iterable[List[str]]:
 
 def _session() -> requests.Session:
     s = requests.Session()
+    # Connection/read errors only: HTTP statuses (429, 5xx) are retried by _http_fetch_json,
+    # which honors Retry-After from the caller's thread.
     retry = Retry(
         total=3,
         backoff_factor=0.35,
-        status_forcelist=(429, 500, 502, 503, 504),
         allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,
         raise_on_status=False,
     )
     s.headers.update({"User-Agent": DEFAULT_USER_AGENT, "Accept": "application/json"})
-    s.mount("https://", HTTPAdapter(max_retries=retry))
-    s.mount("http://", HTTPAdapter(max_retries=retry))
+    # Keep-alive pool sized for the concurrent fan-outs (default maxsize=10 would discard
+    # connections under load and force new TCP/TLS handshakes).
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     return s
 
 
 _SESS = _session()
 
 
-def _http_get_json(url: str, *, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[Any, Dict[str, Any]]:
+class _TokenBucket:
+    """
+    Thread-safe token bucket: `rate` calls per second on average, bursts of up to `burst`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = float(rate)
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_s = (1.0 - self._tokens) / self._rate
+            time.sleep(wait_s)
+
+
+# Pairs endpoints (/tokens/v1, /token-pairs/v1) allow 300 rpm
+_PAIRS_LIMITER = _TokenBucket(rate=5.0, burst=5)
+
+# In-process freshness (seconds) of the slowly-changing endpoints. Pairs endpoints are not cached.
+FEED_TTL_S: Dict[str, float] = {
+    "boosts": 30.0,
+    "profiles": 60.0,
+    "cto": 60.0,
+    "ads": 120.0,
+    "orders": 10.0,
+}
+
+# url -> (monotonic ts, parsed JSON, debug, ETag). Cached payloads are shared: treat them as read-only.
+# LRU bounded to URL_CACHE_MAX entries: per-token orders/pairs URLs would otherwise pile up for
+# the life of the process. Stale entries are kept until evicted (their ETag serves revalidation).
+URL_CACHE_MAX = 512
+_URL_CACHE: OrderedDict[str, Tuple[float, Any, Dict[str, Any], Optional[str]]] = OrderedDict()
+_URL_CACHE_LOCK = threading.Lock()
+
+
+def _url_cache_put(url: str, entry: Tuple[float, Any, Dict[str, Any], Optional[str]]) -> None:
+    with _URL_CACHE_LOCK:
+        _URL_CACHE[url] = entry
+        _URL_CACHE.move_to_end(url)
+        while len(_URL_CACHE) > URL_CACHE_MAX:
+            _URL_CACHE.popitem(last=False)
+
+# url -> result of the GET currently in flight (single-flight: concurrent identical GETs share it)
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _http_get_json(url: str, *, timeout_s: int = DEFAULT_TIMEOUT_S, ttl_s: float = 0.0) -> Tuple[Any, Dict[str, Any]]:
+    """
+    GET + JSON decode. With ttl_s > 0, a successful response is reused for ttl_s seconds;
+    once stale, it is revalidated with If-None-Match when the server sent an ETag.
+    A call for a URL that is already being fetched waits for that response instead of
+    sending its own request.
+    """
+    cached = None
+    if ttl_s > 0:
+        with _URL_CACHE_LOCK:
+            cached = _URL_CACHE.get(url)
+            if cached is not None:
+                _URL_CACHE.move_to_end(url)
+        if cached is not None and time.monotonic() - cached[0] < ttl_s:
+            return cached[1], {**cached[2], "cache": "hit"}
+
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.get(url)
+        leader = fut is None
+        if leader:
+            fut = _INFLIGHT[url] = Future()
+    if not leader:
+        data, dbg = fut.result()
+        return data, {**dbg, "coalesced": True}
+
+    try:
+        res = _http_fetch_json(url, timeout_s, ttl_s, cached)
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(url, None)
+    fut.set_result(res)
+    return res
+
+
+# Rate limited / transient upstream errors: retried with backoff by _http_fetch_json
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+HTTP_MAX_ATTEMPTS = 3
+_RETRY_BACKOFF_S = 0.35
+_RETRY_MAX_SLEEP_S = 10.0
+
+
+def _retry_delay_s(r: requests.Response, attempt: int) -> float:
+    """Retry-After (seconds) when the server sends it, else exponential backoff with jitter."""
+    ra = _safe_float(r.headers.get("Retry-After"), -1.0)
+    if ra >= 0:
+        return min(ra, _RETRY_MAX_SLEEP_S)
+    # Jitter spreads out the workers of a fan-out that were throttled together
+    return min(_RETRY_BACKOFF_S * (2 ** attempt) + random.uniform(0.0, _RETRY_BACKOFF_S), _RETRY_MAX_SLEEP_S)
+
+
+def _http_fetch_json(
+    url: str, timeout_s: int, ttl_s: float, cached: Optional[Tuple[float, Any, Dict[str, Any], Optional[str]]]
+) -> Tuple[Any, Dict[str, Any]]:
     debug: Dict[str, Any] = {"url": url}
+    headers = {"If-None-Match": cached[3]} if cached is not None and cached[3] else None
     try:
-        r = _SESS.get(url, timeout=timeout_s)
+        for attempt in range(HTTP_MAX_ATTEMPTS):
+            r = _SESS.get(url, timeout=timeout_s, headers=headers)
+            if r.status_code not in _RETRY_STATUSES or attempt + 1 >= HTTP_MAX_ATTEMPTS:
+                break
+            time.sleep(_retry_delay_s(r, attempt))
+        if attempt:
+            debug["attempts"] = attempt + 1
         debug["status"] = r.status_code
         debug["elapsed_s"] = getattr(r, "elapsed", None).total_seconds() if getattr(r, "elapsed", None) else None
+        if r.status_code == 304 and cached is not None:
+            _url_cache_put(url, (time.monotonic(), cached[1], cached[2], cached[3]))
+            return cached[1], {**debug, "cache": "revalidated"}
         if r.status_code >= 400:
             debug["text_snippet"] = (r.text or "")[:200]
             return None, debug
-        return r.json(), debug
+        data = _json_loads(r.content)
+        if ttl_s > 0:
+            _url_cache_put(url, (time.monotonic(), data, dict(debug), r.headers.get("ETag")))
+        return data, debug
     except Exception as e:
         debug["error"] = repr(e)
         return None, debug
 
 
-def _normalize_chain_id(chain_id: Any) -> str:
-    c = str(chain_id or "").strip().lower()
+@lru_cache(maxsize=64)
+def _normalize_chain_id_str(chain_id: str) -> str:
+    c = chain_id.strip().lower()
     if c in ("sol", "solana-mainnet", "mainnet", "sol-mainnet"):
         return "solana"
     return c
 
 
+def _normalize_chain_id(chain_id: Any) -> str:
+    # Called for every feed item; the set of chain ids seen is tiny, so the str path is memoized.
+    # The canonical target id (the common case) short-circuits before the cache lookup.
+    if chain_id == CHAIN_ID:
+        return CHAIN_ID
+    return _normalize_chain_id_str(chain_id if type(chain_id) is str else str(chain_id or ""))
+
+
 # =============================================================================
 # API wrappers (DexScreener)
 # =============================================================================
 
-def fetch_token_boosts_latest(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    url = f"{DEX_BASE}/token-boosts/latest/v1"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
+# Endpoint URLs (parametric ones are %-templates: chain id, then address(es))
+_URL_BOOSTS_LATEST = DEX_BASE + "/token-boosts/latest/v1"
+_URL_BOOSTS_TOP = DEX_BASE + "/token-boosts/top/v1"
+_URL_ADS_LATEST = DEX_BASE + "/ads/latest/v1"
+_URL_PROFILES_LATEST = DEX_BASE + "/token-profiles/latest/v1"
+_URL_CTO_LATEST = DEX_BASE + "/community-takeovers/latest/v1"
+_URL_ORDERS_FMT = DEX_BASE + "/orders/v1/%s/%s"
+_URL_TOKENS_FMT = DEX_BASE + "/tokens/v1/%s/%s"
+_URL_TOKEN_PAIRS_FMT = DEX_BASE + "/token-pairs/v1/%s/%s"
+
+# Envelope keys under which each endpoint may wrap its list (docs and practice differ)
+_BOOSTS_KEYS = ("data", "boosts", "tokens", "results")
+_ADS_KEYS = ("data", "ads", "results")
+_PROFILES_KEYS = ("data", "profiles", "results")
+_CTO_KEYS = ("data", "results", "ctos")
+_ORDERS_KEYS = ("orders", "data", "results")
+_PAIRS_KEYS = ("pairs", "data", "results")
+
+
+def _first_list(data: Any, keys: Tuple[str, ...]) -> Optional[List[Any]]:
+    """`data` if it is a list, else the first list found under `keys`; None otherwise."""
+    if type(data) is list:
+        return data
     if isinstance(data, dict):
-        # docs show "Response object"; in practice may be { "data": [...] } or { "boosts": [...] }
-        for k in ("data", "boosts", "tokens", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    if isinstance(data, list):
-        return data, dbg
-    return [], dbg
+        for k in keys:
+            v = data.get(k)
+            if type(v) is list:
+                return v
+    return None
+
+
+def fetch_token_boosts_latest(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    url = _URL_BOOSTS_LATEST
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["boosts"])
+    # docs show "Response object"; in practice may be { "data": [...] } or { "boosts": [...] }
+    return _first_list(data, _BOOSTS_KEYS) or [], dbg
 
 
 def fetch_token_boosts_top(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    url = f"{DEX_BASE}/token-boosts/top/v1"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, dict):
-        for k in ("data", "boosts", "tokens", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    if isinstance(data, list):
-        return data, dbg
-    return [], dbg
+    url = _URL_BOOSTS_TOP
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["boosts"])
+    return _first_list(data, _BOOSTS_KEYS) or [], dbg
 
 
 def fetch_ads_latest(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    url = f"{DEX_BASE}/ads/latest/v1"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        for k in ("data", "ads", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    return [], dbg
+    url = _URL_ADS_LATEST
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["ads"])
+    return _first_list(data, _ADS_KEYS) or [], dbg
 
 
 def fetch_token_profiles_latest(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    url = f"{DEX_BASE}/token-profiles/latest/v1"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        # docs show single object, but in practice might be {data:[...]}
-        for k in ("data", "profiles", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-        # single profile object
-        if isinstance(data.get("tokenAddress"), str) and isinstance(data.get("chainId"), str):
-            return [data], dbg
+    url = _URL_PROFILES_LATEST
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["profiles"])
+    # docs show single object, but in practice might be {data:[...]}
+    items = _first_list(data, _PROFILES_KEYS)
+    if items is not None:
+        return items, dbg
+    # single profile object
+    if isinstance(data, dict) and isinstance(data.get("tokenAddress"), str) and isinstance(data.get("chainId"), str):
+        return [data], dbg
     return [], dbg
 
 
 def fetch_community_takeovers_latest(*, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    url = f"{DEX_BASE}/community-takeovers/latest/v1"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        for k in ("data", "results", "ctos"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    return [], dbg
+    url = _URL_CTO_LATEST
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["cto"])
+    return _first_list(data, _CTO_KEYS) or [], dbg
+
+
+# Candidate / enrichment feeds that don't depend on each other (one GET each)
+FEED_FETCHERS: Dict[str, Callable[..., Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = {
+    "token_boosts_latest": fetch_token_boosts_latest,
+    "token_boosts_top": fetch_token_boosts_top,
+    "ads_latest": fetch_ads_latest,
+    "token_profiles_latest": fetch_token_profiles_latest,
+    "community_takeovers_latest": fetch_community_takeovers_latest,
+}
+
+
+def fetch_all_feeds(
+    names: Optional[Iterable[str]] = None, *, timeout_s: int = DEFAULT_TIMEOUT_S
+) -> Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Fetches the FEED_FETCHERS feeds (or only `names`) concurrently: wall time is the
+    slowest endpoint instead of the sum. Returns {name: (items, debug)} in request order;
+    an exception in one feed becomes ([], {"error": ...}) and doesn't affect the others.
+    """
+    wanted = [n for n in (FEED_FETCHERS if names is None else names) if n in FEED_FETCHERS]
+    out: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]] = {}
+    if not wanted:
+        return out
+    with ThreadPoolExecutor(max_workers=min(HTTP_MAX_WORKERS, len(wanted))) as pool:
+        futures = {n: pool.submit(FEED_FETCHERS[n], timeout_s=timeout_s) for n in wanted}
+        for n, fut in futures.items():
+            try:
+                out[n] = fut.result()
+            except Exception as e:
+                out[n] = ([], {"error": repr(e)})
+    return out
 
 
 def fetch_orders_for_token(chain_id: str, token_address: str, *, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     chain_id = _normalize_chain_id(chain_id)
-    url = f"{DEX_BASE}/orders/v1/{chain_id}/{token_address}"
-    data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        for k in ("orders", "data", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    return [], dbg
+    url = _URL_ORDERS_FMT % (chain_id, token_address)
+    data, dbg = _http_get_json(url, timeout_s=timeout_s, ttl_s=FEED_TTL_S["orders"])
+    return _first_list(data, _ORDERS_KEYS) or [], dbg
 
 
 def fetch_pairs_for_tokens_batch(chain_id: str, token_addresses: List[str], *, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Uses /tokens/v1/{chainId}/{tokenAddresses} (up to 30 token addresses, comma-separated).
+    Longer lists are split into PAIRS_BATCH_MAX-sized calls; their debug dicts are merged
+    (call count, worst status, first error, and the per-call dicts under "chunks").
     Returns a flat list of pair objects.
     """
     chain_id = _normalize_chain_id(chain_id)
     # Keep unique, preserve order
-    seen: set[str] = set()
-    addrs = []
-    for a in token_addresses:
-        aa = (a or "").strip()
-        if not aa:
-            continue
-        if aa.lower() in seen:
-            continue
-        seen.add(aa.lower())
-        addrs.append(aa)
+    addrs = _dedup_ci(token_addresses)
 
     if not addrs:
         return [], {"note": "empty_token_addresses"}
 
-    url = f"{DEX_BASE}/tokens/v1/{chain_id}/" + ",".join(addrs)
+    if len(addrs) > PAIRS_BATCH_MAX:
+        pairs: List[Dict[str, Any]] = []
+        chunks_dbg: List[Dict[str, Any]] = []
+        for ch in _chunks(addrs, PAIRS_BATCH_MAX):
+            pairs_chunk, dbg_ch = fetch_pairs_for_tokens_batch(chain_id, ch, timeout_s=timeout_s)
+            pairs.extend(pairs_chunk)
+            chunks_dbg.append(dbg_ch)
+        statuses = [d["status"] for d in chunks_dbg if isinstance(d.get("status"), int)]
+        merged: Dict[str, Any] = {"calls": len(chunks_dbg), "chunks": chunks_dbg}
+        if statuses:
+            merged["status"] = max(statuses)
+        errors = [d["error"] for d in chunks_dbg if d.get("error")]
+        if errors:
+            merged["error"] = errors[0]
+            merged["errors_count"] = len(errors)
+        return pairs, merged
+
+    url = _URL_TOKENS_FMT % (chain_id, ",".join(addrs))
+    _PAIRS_LIMITER.acquire()
     data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        for k in ("pairs", "data", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    return [], dbg
+    return _first_list(data, _PAIRS_KEYS) or [], dbg
+
+
+def fetch_pairs_for_tokens_bulk(
+    chain_id: str, token_addresses: List[str], *, timeout_s: int = DEFAULT_TIMEOUT_S
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    /tokens/v1 for any number of addresses: deduped (case-insensitive) once, split into
+    PAIRS_BATCH_MAX groups fetched concurrently. A pair can come back for both its base and
+    quote token, so pairs are deduped by pairAddress.
+    Returns (pairs, one debug dict per batch call, in batch order).
+    """
+    addrs = _dedup_ci(token_addresses)
+
+    pairs: List[Dict[str, Any]] = []
+    batch_debug: List[Dict[str, Any]] = []
+    seen_pairs: set[str] = set()
+    chunks = list(_chunks(addrs, PAIRS_BATCH_MAX))
+    if not chunks:
+        return pairs, batch_debug
+    # Batches are independent: fan them out (I/O bound), results come back in submission order
+    with ThreadPoolExecutor(max_workers=min(HTTP_MAX_WORKERS, len(chunks))) as pool:
+        for pairs_chunk, dbg in pool.map(
+            lambda ch: fetch_pairs_for_tokens_batch(chain_id, ch, timeout_s=timeout_s), chunks
+        ):
+            batch_debug.append(dbg)
+            for p in pairs_chunk or []:
+                pa = p.get("pairAddress") if isinstance(p, dict) else None
+                if pa:
+                    if pa in seen_pairs:
+                        continue
+                    seen_pairs.add(pa)
+                pairs.append(p)
+    return pairs, batch_debug
 
 
 def fetch_token_pairs_fallback(chain_id: str, token_address: str, *, timeout_s: int = DEFAULT_TIMEOUT_S) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
@@ -248,73 +507,121 @@ def fetch_token_pairs_fallback(chain_id: str, token_address: str, *, timeout_s:
     Uses /token-pairs/v1/{chainId}/{tokenAddress} for single token.
     """
     chain_id = _normalize_chain_id(chain_id)
-    url = f"{DEX_BASE}/token-pairs/v1/{chain_id}/{token_address}"
+    url = _URL_TOKEN_PAIRS_FMT % (chain_id, token_address)
+    _PAIRS_LIMITER.acquire()
     data, dbg = _http_get_json(url, timeout_s=timeout_s)
-    if isinstance(data, list):
-        return data, dbg
-    if isinstance(data, dict):
-        for k in ("pairs", "data", "results"):
-            if isinstance(data.get(k), list):
-                return data[k], dbg
-    return [], dbg
+    return _first_list(data, _PAIRS_KEYS) or [], dbg
 
 
 # =============================================================================
 # Scoring / filtering
 # =============================================================================
 
+@dataclass(slots=True)
+class PairMetrics:
+    """Typed metrics of one pair. Numeric fields are already converted (no _safe_* needed)."""
+
+    pair_address: str
+    dex_id: str
+    price_usd: Any
+    liquidity_usd: float
+    fdv: float
+    market_cap: float
+    vol5m: float
+    vol1h: float
+    vol24h: float
+    buys5m: int
+    sells5m: int
+    net_buy5m: int
+    m5pct: float
+    h1pct: float
+    h6pct: float
+    h24pct: float
+    age_min: float
+    turnover_1h_over_liq: float
+    base_token_symbol: Any
+    base_token_name: Any
+    base_token_address: Any
+    quote_token_symbol: Any
+    quote_token_address: Any
+
+    @classmethod
+    def from_pair(cls, pair: Dict[str, Any]) -> "PairMetrics":
+        get = pair.get
+        liq_usd = _safe_float((get("liquidity") or _EMPTY).get("usd"))
+        vol = get("volume") or _EMPTY
+        vol1 = _safe_float(vol.get("h1"))
+        m5 = (get("txns") or _EMPTY).get("m5") or _EMPTY
+        buys5 = _safe_int(m5.get("buys"))
+        sells5 = _safe_int(m5.get("sells"))
+        pc = get("priceChange") or _EMPTY
+        base = get("baseToken") or _EMPTY
+        quote = get("quoteToken") or _EMPTY
+
+        return cls(
+            pair_address=get("pairAddress") or "",
+            dex_id=get("dexId") or "",
+            price_usd=get("priceUsd"),
+            liquidity_usd=liq_usd,
+            fdv=_safe_float(get("fdv")),
+            market_cap=_safe_float(get("marketCap")),
+            vol5m=_safe_float(vol.get("m5")),
+            vol1h=vol1,
+            vol24h=_safe_float(vol.get("h24")),
+            buys5m=buys5,
+            sells5m=sells5,
+            net_buy5m=buys5 - sells5,
+            m5pct=_safe_float(pc.get("m5")),
+            h1pct=_safe_float(pc.get("h1")),
+            h6pct=_safe_float(pc.get("h6")),
+            h24pct=_safe_float(pc.get("h24")),
+            age_min=_age_minutes_from_pair_created_at(get("pairCreatedAt")),
+            turnover_1h_over_liq=(vol1 / liq_usd) if liq_usd > 0 else 0.0,
+            base_token_symbol=base.get("symbol"),
+            base_token_name=base.get("name"),
+            base_token_address=base.get("address"),
+            quote_token_symbol=quote.get("symbol"),
+            quote_token_address=quote.get("address"),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Row layout used by the scan results (camelCase keys, as shown in app.py)."""
+        return {
+            "pairAddress": self.pair_address,
+            "dexId": self.dex_id,
+            "priceUsd": self.price_usd,
+            "liquidityUsd": self.liquidity_usd,
+            "fdv": self.fdv,
+            "marketCap": self.market_cap,
+            "vol5m": self.vol5m,
+            "vol1h": self.vol1h,
+            "vol24h": self.vol24h,
+            "buys5m": self.buys5m,
+            "sells5m": self.sells5m,
+            "netBuy5m": self.net_buy5m,
+            "m5pct": self.m5pct,
+            "h1pct": self.h1pct,
+            "h6pct": self.h6pct,
+            "h24pct": self.h24pct,
+            "ageMin": self.age_min,
+            "turnover_1h_over_liq": self.turnover_1h_over_liq,
+            "baseTokenSymbol": self.base_token_symbol,
+            "baseTokenName": self.base_token_name,
+            "baseTokenAddress": self.base_token_address,
+            "quoteTokenSymbol": self.quote_token_symbol,
+            "quoteTokenAddress": self.quote_token_address,
+            "urlDexscreener": f"https://dexscreener.com/solana/{self.pair_address}" if self.pair_address else "",
+        }
+
+
 def compute_metrics_from_pair(pair: Dict[str, Any]) -> Dict[str, Any]:
-    liq_usd = _safe_float((pair.get("liquidity") or {}).get("usd"))
-    fdv = _safe_float(pair.get("fdv"))
-    mcap = _safe_float(pair.get("marketCap"))
-    vol = pair.get("volume") or {}
-    vol5 = _safe_float(vol.get("m5"))
-    vol1 = _safe_float(vol.get("h1"))
-    vol24 = _safe_float(vol.get("h24"))
-    txns = pair.get("txns") or {}
-    m5 = txns.get("m5") or {}
-    buys5 = _safe_int(m5.get("buys"))
-    sells5 = _safe_int(m5.get("sells"))
-    net_buy_5m = buys5 - sells5
-
-    pc = pair.get("priceChange") or {}
-    m5pct = _safe_float(pc.get("m5"))
-    h1pct = _safe_float(pc.get("h1"))
-    h6pct = _safe_float(pc.get("h6"))
-    h24pct = _safe_float(pc.get("h24"))
-
-    age_min = _age_minutes_from_pair_created_at(pair.get("pairCreatedAt"))
-    turnover_1h_over_liq = (vol1 / liq_usd) if liq_usd > 0 else 0.0
-
-    base = pair.get("baseToken") or {}
-    quote = pair.get("quoteToken") or {}
+    return PairMetrics.from_pair(pair).as_dict()
 
-    return {
-        "pairAddress": pair.get("pairAddress") or "",
-        "dexId": pair.get("dexId") or "",
-        "priceUsd": pair.get("priceUsd"),
-        "liquidityUsd": liq_usd,
-        "fdv": fdv,
-        "marketCap": mcap,
-        "vol5m": vol5,
-        "vol1h": vol1,
-        "vol24h": vol24,
-        "buys5m": buys5,
-        "sells5m": sells5,
-        "netBuy5m": net_buy_5m,
-        "m5pct": m5pct,
-        "h1pct": h1pct,
-        "h6pct": h6pct,
-        "h24pct": h24pct,
-        "ageMin": age_min,
-        "turnover_1h_over_liq": turnover_1h_over_liq,
-        "baseTokenSymbol": base.get("symbol"),
-        "baseTokenName": base.get("name"),
-        "baseTokenAddress": base.get("address"),
-        "quoteTokenSymbol": quote.get("symbol"),
-        "quoteTokenAddress": quote.get("address"),
-        "urlDexscreener": f"https://dexscreener.com/solana/{pair.get('pairAddress')}" if pair.get("pairAddress") else "",
-    }
+
+def compute_metrics_batch(pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """compute_metrics_from_pair over a list, built in one comprehension (no per-row append)."""
+    from_pair = PairMetrics.from_pair
+    return [from_pair(p).as_dict() for p in pairs]
 
 
 def score_pair(row: Dict[str, Any], *, pump_mode: bool) -> Dict[str, Any]:
@@ -356,132 +663,277 @@ def score_pair(row: Dict[str, Any], *, pump_mode: bool) -> Dict[str, Any]:
     return {"score": float(score), "spike_score": float(spike_score)}
 
 
-def _mode_thresholds(mode: str, *, pump_mode: bool) -> Dict[str, float]:
+_INV_LN10 = 1.0 / math.log(10.0)
+
+
+# Optional Numba kernel for score_pairs_batch (pip install numba); the NumPy path is used otherwise
+try:
+    import numpy as _np
+    from numba import njit
+except ImportError:
+    _score_kernel = None
+else:
+    @njit(cache=True, boundscheck=False)
+    def _score_kernel(liq, vol1, netbuy, m5pct, h1pct, turnover, m5_w, out_score, out_spike):
+        # Same formulas as score_pair, fused in one loop. Comparisons are written out so NaN
+        # inputs follow the Python builtins (max(a, b) keeps a unless b > a); no fastmath for that reason.
+        for i in range(liq.shape[0]):
+            lq = liq[i] if not (0.0 > liq[i]) else 0.0
+            v1 = vol1[i] if not (0.0 > vol1[i]) else 0.0
+            nb = netbuy[i] if not (0.0 > netbuy[i]) else 0.0
+            flow_s = math.log10(1.0 + nb)
+
+            mom = (m5pct[i] * m5_w) + (h1pct[i] * 0.35)
+            a = mom / 10.0
+            b = turnover[i] * 12.0
+            c = flow_s / 2.0
+            spike = (
+                0.55 * (a if a > 0.0 else 0.0) +
+                0.30 * (b if b < 2.5 else 2.5) +
+                0.25 * (c if c < 2.0 else 2.0)
+            )
+            out_spike[i] = spike
+            out_score[i] = (
+                0.30 * math.log10(1.0 + lq) +
+                0.25 * math.log10(1.0 + v1) +
+                1.15 * spike +
+                (0.15 if m5pct[i] > 0 else 0.0)
+            )
+
+    # Compile (or load from the on-disk cache) now rather than during the first scan
+    try:
+        _one = _np.zeros(1)
+        _score_kernel(_one, _one, _one, _one, _one, _one, 1.15, _np.zeros(1), _np.zeros(1))
+    except Exception:
+        _score_kernel = None
+
+
+def score_pairs_batch(rows: List[Dict[str, Any]], *, pump_mode: bool) -> None:
+    """
+    score_pair for a whole batch: the inputs are pulled into float64 columns once and the
+    formulas run as NumPy ufuncs. Writes "score" / "spike_score" into each row, in place.
+    """
+    if not rows:
+        return
+    import numpy as np
+
+    n = len(rows)
+
+    def col(key: str, conv: Callable[[Any], Any] = _safe_float) -> "np.ndarray":
+        return np.fromiter((conv(r.get(key)) for r in rows), dtype=np.float64, count=n)
+
+    liq = col("liquidityUsd")
+    vol1 = col("vol1h")
+    netbuy = col("netBuy5m", _safe_int)
+    m5pct = col("m5pct")
+    h1pct = col("h1pct")
+    turnover = col("turnover_1h_over_liq")
+    m5_w = 1.15 if pump_mode else 0.85
+
+    if _score_kernel is not None:
+        score = np.empty(n)
+        spike = np.empty(n)
+        _score_kernel(liq, vol1, netbuy, m5pct, h1pct, turnover, m5_w, score, spike)
+    else:
+        # fmax/fmin where score_pair has max(const, x)/min(const, x): same NaN handling as the builtins.
+        # log10(1 + x) as log1p(x) / ln(10): no (1 + x) temporary, exact for small x.
+        liq_s = np.log1p(np.maximum(liq, 0.0)) * _INV_LN10
+        vol_s = np.log1p(np.maximum(vol1, 0.0)) * _INV_LN10
+        flow_s = np.log1p(np.maximum(netbuy, 0.0)) * _INV_LN10
+
+        mom = (m5pct * m5_w) + (h1pct * 0.35)
+
+        spike = (
+            0.55 * np.fmax(0.0, mom / 10.0) +
+            0.30 * np.fmin(2.5, turnover * 12.0) +
+            0.25 * np.fmin(2.0, flow_s / 2.0)
+        )
+        score = (
+            0.30 * liq_s +
+            0.25 * vol_s +
+            1.15 * spike +
+            np.where(m5pct > 0, 0.15, 0.0)
+        )
+
+    for r, sc, sp in zip(rows, score.tolist(), spike.tolist()):
+        r["score"] = sc
+        r["spike_score"] = sp
+
+
+class ModeThresholds(NamedTuple):
+    min_liq: float
+    min_vol5: float
+    min_netbuy5: int
+    max_age_min: float
+    min_score: float
+
+
+# mode -> (pump_mode thresholds, normal thresholds)
+_MODE_TABLE: Dict[str, Tuple[ModeThresholds, ModeThresholds]] = {
+    "ultra_early": (
+        ModeThresholds(2500.0, 40.0, 0, 240.0, 0.15),
+        ModeThresholds(4000.0, 80.0, 1, 240.0, 0.15),
+    ),
+    "early_strict": (
+        ModeThresholds(6000.0, 120.0, 1, 24.0 * 60.0, 0.45),
+        ModeThresholds(12000.0, 250.0, 2, 24.0 * 60.0, 0.45),
+    ),
+    "early": (
+        ModeThresholds(3500.0, 80.0, 0, 24.0 * 60.0, 0.25),
+        ModeThresholds(8000.0, 160.0, 1, 24.0 * 60.0, 0.25),
+    ),
+    "strict": (
+        ModeThresholds(15000.0, 250.0, 2, 7.0 * 24.0 * 60.0, 0.85),
+        ModeThresholds(25000.0, 500.0, 3, 7.0 * 24.0 * 60.0, 0.85),
+    ),
+    "degen": (
+        ModeThresholds(2500.0, 60.0, 0, 7.0 * 24.0 * 60.0, 0.20),
+        ModeThresholds(5000.0, 120.0, 1, 7.0 * 24.0 * 60.0, 0.20),
+    ),
+}
+
+
+def _mode_thresholds(mode: str, *, pump_mode: bool) -> ModeThresholds:
     """
     Thresholds are designed for Solana microcaps.
     Values are intentionally permissive in pump_mode.
+    Unknown modes fall back to degen.
     """
-    mode = (mode or "").strip().lower()
+    pair = _MODE_TABLE.get((mode or "").strip().lower()) or _MODE_TABLE["degen"]
+    return pair[0 if pump_mode else 1]
 
-    if mode == "ultra_early":
-        return {
-            "min_liq": 2500.0 if pump_mode else 4000.0,
-            "min_vol5": 40.0 if pump_mode else 80.0,
-            "min_netbuy5": 0.0 if pump_mode else 1.0,
-            "max_age_min": 240.0,
-            "min_score": 0.15,
-        }
-    if mode == "early_strict":
-        return {
-            "min_liq": 6000.0 if pump_mode else 12000.0,
-            "min_vol5": 120.0 if pump_mode else 250.0,
-            "min_netbuy5": 1.0 if pump_mode else 2.0,
-            "max_age_min": 24.0 * 60.0,
-            "min_score": 0.45,
-        }
-    if mode == "early":
-        return {
-            "min_liq": 3500.0 if pump_mode else 8000.0,
-            "min_vol5": 80.0 if pump_mode else 160.0,
-            "min_netbuy5": 0.0 if pump_mode else 1.0,
-            "max_age_min": 24.0 * 60.0,
-            "min_score": 0.25,
-        }
-    if mode == "strict":
-        return {
-            "min_liq": 15000.0 if pump_mode else 25000.0,
-            "min_vol5": 250.0 if pump_mode else 500.0,
-            "min_netbuy5": 2.0 if pump_mode else 3.0,
-            "max_age_min": 7.0 * 24.0 * 60.0,
-            "min_score": 0.85,
-        }
-    # default: degen
-    return {
-        "min_liq": 2500.0 if pump_mode else 5000.0,
-        "min_vol5": 60.0 if pump_mode else 120.0,
-        "min_netbuy5": 0.0 if pump_mode else 1.0,
-        "max_age_min": 7.0 * 24.0 * 60.0,
-        "min_score": 0.20,
-    }
+
+_ANTI_DEAD_MAX_AGE_MIN = 10 * 24 * 60.0
 
 
-def _anti_dead_pass(row: Dict[str, Any], opts: "ScanOptions") -> bool:
+def _make_anti_dead(opts: "ScanOptions") -> Callable[[PairMetrics], bool]:
     """
     Quick prefilter to avoid completely dead pairs.
     Crucially, it respects the user's trending thresholds (and pump_mode).
+    Returns a predicate specialised for one scan: the opts-derived floors are computed once.
     """
-    liq = _safe_float(row.get("liquidityUsd"))
-    vol5 = _safe_float(row.get("vol5m"))
-    buys5 = _safe_int(row.get("buys5m"))
-    sells5 = _safe_int(row.get("sells5m"))
-    age_min = _safe_float(row.get("ageMin"), 999999.0)
+    fresh_max_age = 90.0 if opts.pump_mode else 60.0
+    max_age = _ANTI_DEAD_MAX_AGE_MIN
+    liq_floor = max(1200.0, opts.trending_min_liquidity * (0.75 if opts.pump_mode else 0.85))
+    min_txns5 = 1 if opts.pump_mode else 2
+    vol_floor = max(40.0, opts.trending_min_vol5m * (0.75 if opts.pump_mode else 0.85))
+
+    def anti_dead_pass(m: PairMetrics) -> bool:
+        # Age alone decides the common cases: check it first. The guards below only reject,
+        # so their order doesn't change the result.
+        age_min = m.age_min
+
+        # Keep recent tokens even with low metrics
+        if age_min <= fresh_max_age:
+            return True
+
+        # Avoid very old stagnating tokens
+        if age_min > max_age:
+            return False
+
+        # Liquidity guard aligned with opts
+        if m.liquidity_usd < liq_floor:
+            return False
+
+        # Activity guard aligned with opts
+        if m.buys5m + m.sells5m < min_txns5 and m.vol5m < vol_floor:
+            return False
 
-    # Keep recent tokens even with low metrics
-    if age_min <= (90.0 if opts.pump_mode else 60.0):
         return True
 
-    # Liquidity guard aligned with opts
-    liq_floor = max(1200.0, opts.trending_min_liquidity * (0.75 if opts.pump_mode else 0.85))
-    if liq < liq_floor:
-        return False
+    return anti_dead_pass
 
-    # Activity guard aligned with opts
-    txns5 = buys5 + sells5
-    vol_floor = max(40.0, opts.trending_min_vol5m * (0.75 if opts.pump_mode else 0.85))
-    if txns5 < (1 if opts.pump_mode else 2) and vol5 < vol_floor:
-        return False
 
-    # Avoid very old stagnating tokens
-    if age_min > (10 * 24 * 60):
-        return False
+# Trending rejection reasons, as bits: the hot path only needs pass/fail, strings are built
+# by _format_reasons for the debug output.
+_REJECT_LOW_LIQ = 1 << 0
+_REJECT_LOW_VOL = 1 << 1
+_REJECT_LOW_NETBUY = 1 << 2
+_REJECT_LOW_SPIKE = 1 << 3
+_REJECT_PROMOTED_NO_BUY = 1 << 4
+_REJECT_M5_NON_POSITIVE = 1 << 5
 
-    return True
+
+def _format_reasons(mask: int, row: Dict[str, Any]) -> List[str]:
+    """Human-readable reasons for a _make_trending_reject_mask result (same order as the checks)."""
+    reasons: List[str] = []
+    if mask & _REJECT_LOW_LIQ:
+        reasons.append(f"low_liq:{_safe_float(row.get('liquidityUsd')):.0f}")
+    if mask & _REJECT_LOW_VOL:
+        reasons.append(f"low_vol:1h={_safe_float(row.get('vol1h')):.0f},5m={_safe_float(row.get('vol5m')):.0f}")
+    if mask & _REJECT_LOW_NETBUY:
+        reasons.append(f"low_netbuy:{_safe_int(row.get('netBuy5m'))}")
+    if mask & _REJECT_LOW_SPIKE:
+        reasons.append(f"low_spike:{_safe_float(row.get('spike_score')):.3f}")
+    if mask & _REJECT_PROMOTED_NO_BUY:
+        reasons.append("promoted_no_real_buy")
+    if mask & _REJECT_M5_NON_POSITIVE:
+        reasons.append("m5_non_positive")
+    return reasons
 
 
-def _trending_reasons(row: Dict[str, Any], opts: "ScanOptions") -> List[str]:
+def _make_trending_reject_mask(opts: "ScanOptions") -> Callable[[Dict[str, Any]], int]:
     """
-    Returns reasons of rejection (empty list = passes).
+    Returns a function giving the _REJECT_* bits of a row (0 = passes),
+    specialised for one scan (opts thresholds bound as locals).
     The idea is to be conservative against "paid but dead" tokens.
     """
-    reasons: List[str] = []
+    min_liq = opts.trending_min_liquidity
+    min_vol1h = opts.trending_min_vol1h
+    min_vol5m = opts.trending_min_vol5m
+    min_netbuy5m = opts.trending_min_netbuy5m
+    spike_min = opts.spike_score_min
+    promo_spike_min = max(spike_min, 0.40)
+    m5_spike_min = max(spike_min, 0.55)
 
-    liq = _safe_float(row.get("liquidityUsd"))
-    vol1 = _safe_float(row.get("vol1h"))
-    vol5 = _safe_float(row.get("vol5m"))
-    netbuy5 = _safe_int(row.get("netBuy5m"))
-    spike_score = _safe_float(row.get("spike_score"))
-    turnover = _safe_float(row.get("turnover_1h_over_liq"))
-    m5pct = _safe_float(row.get("m5pct"))
-    boost_amt = _safe_float(row.get("boostAmount"))
+    def trending_reject_mask(row: Dict[str, Any]) -> int:
+        mask = 0
 
-    if liq < opts.trending_min_liquidity:
-        reasons.append(f"low_liq:{liq:.0f}")
+        liq = _safe_float(row.get("liquidityUsd"))
+        vol1 = _safe_float(row.get("vol1h"))
+        vol5 = _safe_float(row.get("vol5m"))
+        netbuy5 = _safe_int(row.get("netBuy5m"))
+        spike_score = _safe_float(row.get("spike_score"))
+        turnover = _safe_float(row.get("turnover_1h_over_liq"))
+        m5pct = _safe_float(row.get("m5pct"))
+        boost_amt = _safe_float(row.get("boostAmount"))
 
-    if (vol1 < opts.trending_min_vol1h) and (vol5 < opts.trending_min_vol5m):
-        reasons.append(f"low_vol:1h={vol1:.0f},5m={vol5:.0f}")
+        if liq < min_liq:
+            mask |= _REJECT_LOW_LIQ
 
-    if netbuy5 < opts.trending_min_netbuy5m:
-        reasons.append(f"low_netbuy:{netbuy5}")
+        if (vol1 < min_vol1h) and (vol5 < min_vol5m):
+            mask |= _REJECT_LOW_VOL
 
-    # Minimum spike requirement (if configured)
-    if spike_score < opts.spike_score_min:
-        reasons.append(f"low_spike:{spike_score:.3f}")
+        if netbuy5 < min_netbuy5m:
+            mask |= _REJECT_LOW_NETBUY
 
-    # Paid promotion sanity: boosted but no real flow/turnover
-    if boost_amt > 0 and netbuy5 <= 0 and turnover < 0.01 and spike_score < max(opts.spike_score_min, 0.40):
-        reasons.append("promoted_no_real_buy")
+        # Minimum spike requirement (if configured)
+        if spike_score < spike_min:
+            mask |= _REJECT_LOW_SPIKE
 
-    # If m5 is negative, keep only if spike is strong (avoid catching the top too often)
-    if m5pct <= 0.0 and spike_score < max(opts.spike_score_min, 0.55):
-        reasons.append("m5_non_positive")
+        # Paid promotion sanity: boosted but no real flow/turnover
+        if boost_amt > 0 and netbuy5 <= 0 and turnover < 0.01 and spike_score < promo_spike_min:
+            mask |= _REJECT_PROMOTED_NO_BUY
 
-    return reasons
+        # If m5 is negative, keep only if spike is strong (avoid catching the top too often)
+        if m5pct <= 0.0 and spike_score < m5_spike_min:
+            mask |= _REJECT_M5_NON_POSITIVE
+
+        return mask
+
+    return trending_reject_mask
 
 
 # =============================================================================
 # Main scan
 # =============================================================================
 
+# verbose_debug reports the first N filtered tokens; nothing is collected past that
+WHY_FILTERED_MAX = 400
+# errors reported in the scan debug payload
+ERRORS_MAX = 50
+
+
 @dataclass
 class ScanOptions:
     selected_modes: List[str]
@@ -517,32 +969,32 @@ def _index_by_token(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     return idx
 
 
-def _merge_candidate(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Merge src into dst, preferring existing strong fields but keeping the maximum boost values.
-    """
-    if not dst:
-        return dict(src)
+# Primary source ranking (candidate merge and candidates_max cut)
+_SOURCE_PRIORITY: Mapping[str, int] = MappingProxyType({"boosts": 3, "ads": 2, "cto": 1, "profiles": 0})
 
-    out = dict(dst)
 
-    # Merge sources
-    s1 = out.get("sources") or []
-    if isinstance(s1, str):
-        s1 = [s1]
+def _merge_into(out: Dict[str, Any], src: Dict[str, Any]) -> None:
+    """
+    Merge src into out (in place), preferring existing strong fields but keeping the maximum boost values.
+    """
+    # Merge sources (at most one per feed: a list scan beats maintaining a set, and keeps
+    # first-seen order). Profile entries carry none, so they skip this entirely.
     s2 = src.get("sources") or []
-    if isinstance(s2, str):
-        s2 = [s2]
-    for s in (src.get("source"), *s2):
-        if s and s not in s1:
-            s1.append(s)
-    out["sources"] = s1
+    if src.get("source") or s2:
+        s1 = out.get("sources") or []
+        if isinstance(s1, str):
+            s1 = [s1]
+        if isinstance(s2, str):
+            s2 = [s2]
+        for s in (src.get("source"), *s2):
+            if s and s not in s1:
+                s1.append(s)
+        out["sources"] = s1
 
     # Priority for primary source
-    priority = {"boosts": 3, "ads": 2, "cto": 1, "profiles": 0}
     src_primary = src.get("source")
     dst_primary = out.get("source")
-    if priority.get(str(src_primary), 0) > priority.get(str(dst_primary), 0):
+    if _SOURCE_PRIORITY.get(str(src_primary), 0) > _SOURCE_PRIORITY.get(str(dst_primary), 0):
         out["source"] = src_primary
 
     # Boost numbers (max)
@@ -558,7 +1010,34 @@ def _merge_candidate(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]
         if not out.get(k) and src.get(k):
             out[k] = src[k]
 
-    return out
+
+def _pair_liq_vol(p: Dict[str, Any]) -> Tuple[float, float]:
+    """Best-pair ranking key: (liquidity USD, 24h volume). Numeric fields skip the _safe_float call."""
+    liq = (p.get("liquidity") or _EMPTY).get("usd")
+    vol = (p.get("volume") or _EMPTY).get("h24")
+    return (
+        liq if type(liq) is float else _safe_float(liq),
+        vol if type(vol) is float else _safe_float(vol),
+    )
+
+
+def _pair_sides_lower(p: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    (base, quote) token addresses of a pair, stripped + lowercased.
+    Pair dicts may be shared through the URL cache: callers memoize the result on their side
+    instead of writing it into the pair.
+    """
+    return (
+        str((p.get("baseToken") or _EMPTY).get("address") or "").strip().lower(),
+        str((p.get("quoteToken") or _EMPTY).get("address") or "").strip().lower(),
+    )
+
+
+def _links_count(it: Mapping[str, Any]) -> int:
+    """Number of entries in a profile/CTO item's "links" list (0 when missing or not a list)."""
+    links = it.get("links")
+    # JSON decoders only produce plain lists: the exact type check is enough, one .get() per item
+    return len(links) if type(links) is list else 0
 
 
 def _candidate_from_boost_item(it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -577,6 +1056,7 @@ def _candidate_from_boost_item(it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return {
         "chainId": chain,
         "tokenAddress": ta,
+        "_taLower": ta.lower(),
         "source": "boosts",
         "sources": ["boosts"],
         "boostAmount": _safe_float(amount),
@@ -596,6 +1076,7 @@ def _candidate_from_ad_item(it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return {
         "chainId": chain,
         "tokenAddress": ta,
+        "_taLower": ta.lower(),
         "source": "ads",
         "sources": ["ads"],
         "adType": it.get("type"),
@@ -615,12 +1096,13 @@ def _candidate_from_cto_item(it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return {
         "chainId": chain,
         "tokenAddress": ta,
+        "_taLower": ta.lower(),
         "source": "cto",
         "sources": ["cto"],
         "isCTO": True,
         "profileUrl": it.get("url") or "",
         "profileDescription": it.get("description") or "",
-        "profileLinksCount": len(it.get("links") or []) if isinstance(it.get("links"), list) else 0,
+        "profileLinksCount": _links_count(it),
     }
 
 
@@ -703,59 +1185,97 @@ def run_scan_for_modes(
         "api_debug": {},
     }
 
+    # Nothing to scan: no candidate feed, or no mode for a row to qualify for. Return before
+    # any HTTP call instead of running the whole pipeline to an empty result.
+    if not (opts.include_boosts or opts.include_ads or opts.include_cto):
+        debug["why"] = "no_source_enabled"
+        return [], debug
+    if not opts.selected_modes:
+        debug["why"] = "no_modes_selected"
+        return [], debug
+
     errors: List[str] = []
     why_filtered_list: List[Dict[str, Any]] = []
+    # Bounded while collecting (keeps the first entries, like the former [:400] slice)
+    log_why = opts.verbose_debug
 
     # -------------------------------------------------------------------------
     # 1) Collect paid candidates: Boosts, Ads, CTO
     # -------------------------------------------------------------------------
     candidates_by_token: Dict[str, Dict[str, Any]] = {}
 
+    def _add_candidate(c: Dict[str, Any]) -> None:
+        key = c["_taLower"]
+        existing = candidates_by_token.get(key)
+        if existing is None:
+            candidates_by_token[key] = c
+        else:
+            _merge_into(existing, c)
+
+    # The enabled feeds are independent GETs: fetch them all at once. Profiles (section 2)
+    # are included so that round-trip overlaps with the candidate feeds.
+    wanted_feeds: List[str] = []
+    if opts.include_boosts:
+        wanted_feeds.append("token_boosts_latest")
+        if opts.pump_mode:
+            wanted_feeds.append("token_boosts_top")
+    if opts.include_ads:
+        wanted_feeds.append("ads_latest")
+    if opts.include_cto:
+        wanted_feeds.append("community_takeovers_latest")
+    if opts.include_profiles:
+        wanted_feeds.append("token_profiles_latest")
+    feeds = fetch_all_feeds(wanted_feeds)
+
     boosts_items: List[Dict[str, Any]] = []
     if opts.include_boosts:
         # Always include latest boosts; optionally merge with "top" for visibility
-        latest, dbg_latest = fetch_token_boosts_latest()
+        latest, dbg_latest = feeds["token_boosts_latest"]
         debug["api_debug"]["token_boosts_latest"] = dbg_latest
         boosts_items.extend(latest)
 
         if opts.pump_mode:
-            top, dbg_top = fetch_token_boosts_top()
+            top, dbg_top = feeds["token_boosts_top"]
             debug["api_debug"]["token_boosts_top"] = dbg_top
             boosts_items.extend(top)
 
     debug["counts"] = {"boost_items_raw": len(boosts_items)}
 
+    # latest + top (and repeated orders in latest) list the same boost many times: an item
+    # identical on every field _merge_into reads would merge as a no-op, so skip it
+    seen_boosts: set = set()
     for it in boosts_items:
         c = _candidate_from_boost_item(it)
         if not c:
             continue
-        key = c["tokenAddress"].lower()
-        candidates_by_token[key] = _merge_candidate(candidates_by_token.get(key, {}), c)
+        key = (c["_taLower"], c["boostAmount"], c["boostTotal"], repr(c["boostType"]), c["profileUrl"])
+        if key in seen_boosts:
+            continue
+        seen_boosts.add(key)
+        _add_candidate(c)
 
     if opts.include_ads:
-        ads_items, dbg_ads = fetch_ads_latest()
+        ads_items, dbg_ads = feeds["ads_latest"]
         debug["api_debug"]["ads_latest"] = dbg_ads
         debug["counts"]["ads_items_raw"] = len(ads_items)
         for it in ads_items:
             c = _candidate_from_ad_item(it)
             if not c:
                 continue
-            key = c["tokenAddress"].lower()
-            candidates_by_token[key] = _merge_candidate(candidates_by_token.get(key, {}), c)
+            _add_candidate(c)
     else:
         debug["counts"]["ads_items_raw"] = 0
 
     cto_items: List[Dict[str, Any]] = []
     if opts.include_cto:
-        cto_items, dbg_cto = fetch_community_takeovers_latest()
+        cto_items, dbg_cto = feeds["community_takeovers_latest"]
         debug["api_debug"]["cto_latest"] = dbg_cto
         debug["counts"]["cto_items_raw"] = len(cto_items)
         for it in cto_items:
             c = _candidate_from_cto_item(it)
             if not c:
                 continue
-            key = c["tokenAddress"].lower()
-            candidates_by_token[key] = _merge_candidate(candidates_by_token.get(key, {}), c)
+            _add_candidate(c)
     else:
         debug["counts"]["cto_items_raw"] = 0
 
@@ -766,11 +1286,10 @@ def run_scan_for_modes(
     # Cut to candidates_max (prefer boosted > ads > cto)
     def _cand_priority(c: Dict[str, Any]) -> Tuple[int, float]:
         src = str(c.get("source") or "")
-        p = {"boosts": 3, "ads": 2, "cto": 1}.get(src, 0)
-        return (p, _safe_float(c.get("boostAmount")))
+        return (_SOURCE_PRIORITY.get(src, 0), _safe_float(c.get("boostAmount")))
 
-    candidates.sort(key=_cand_priority, reverse=True)
-    candidates = candidates[: max(1, opts.candidates_max)]
+    # Only the top candidates_max matter: partial selection instead of a full sort
+    candidates = heapq.nlargest(max(1, opts.candidates_max), candidates, key=_cand_priority)
 
     debug["counts"]["candidates_unique"] = len(candidates)
 
@@ -781,60 +1300,57 @@ def run_scan_for_modes(
     # -------------------------------------------------------------------------
     # 2) Profiles enrichment
     # -------------------------------------------------------------------------
+    # token -> raw profile item (the last one wins); enrichment dicts are only built for
+    # tokens that survived the candidates_max cut
     profiles_idx: Dict[str, Dict[str, Any]] = {}
     if opts.include_profiles:
-        profiles, dbg_profiles = fetch_token_profiles_latest()
+        profiles, dbg_profiles = feeds["token_profiles_latest"]
         debug["api_debug"]["profiles_latest"] = dbg_profiles
         debug["counts"]["profiles_raw"] = len(profiles)
+        target, normalize = CHAIN_ID, _normalize_chain_id
         for p in profiles:
-            chain = _normalize_chain_id(p.get("chainId"))
-            if chain != CHAIN_ID:
+            # Off-chain profiles are skipped before any other field is read
+            if normalize(p.get("chainId")) != target:
                 continue
             ta = (p.get("tokenAddress") or "").strip().lower()
             if not ta:
                 continue
-            profiles_idx[ta] = {
+            profiles_idx[ta] = p
+    else:
+        debug["counts"]["profiles_raw"] = 0
+
+    if profiles_idx:
+        # In-place merge: c is the dict held by candidates_by_token, nothing to write back
+        for c in candidates:
+            p = profiles_idx.get(c["_taLower"])
+            if p is None:
+                continue
+            _merge_into(c, {
                 "profileUrl": p.get("url") or "",
                 "profileDescription": p.get("description") or "",
-                "profileLinksCount": len(p.get("links") or []) if isinstance(p.get("links"), list) else 0,
+                "profileLinksCount": _links_count(p),
                 "icon": p.get("icon") or "",
                 "header": p.get("header") or "",
-            }
-    else:
-        debug["counts"]["profiles_raw"] = 0
-
-    for c in candidates:
-        ta = (c.get("tokenAddress") or "").strip().lower()
-        if not ta:
-            continue
-        if ta in profiles_idx:
-            c = _merge_candidate(c, profiles_idx[ta])
-            candidates_by_token[ta] = c  # keep map in sync
+            })
 
     # -------------------------------------------------------------------------
     # 3) Fetch pairs data in batches (official /tokens/v1, up to 30 addresses)
     # -------------------------------------------------------------------------
-    token_addrs = [c.get("tokenAddress") for c in candidates if c.get("tokenAddress")]
-    token_addrs = [str(a).strip() for a in token_addrs if str(a).strip()]
+    # Candidates are keyed by lowercased address, but dedupe anyway: a repeated address would
+    # be sent in a pairs batch (and scanned) twice
+    token_addrs = _dedup_ci(str(c.get("tokenAddress") or "") for c in candidates)
 
-    all_pairs: List[Dict[str, Any]] = []
-    api_pairs_debug: List[Dict[str, Any]] = []
-    for ch in _chunks(token_addrs, 30):
-        pairs_chunk, dbg_pairs = fetch_pairs_for_tokens_batch(CHAIN_ID, ch)
-        api_pairs_debug.append(dbg_pairs)
-        if pairs_chunk:
-            all_pairs.extend(pairs_chunk)
+    all_pairs, api_pairs_debug = fetch_pairs_for_tokens_bulk(CHAIN_ID, token_addrs)
 
     debug["api_debug"]["pairs_batch_calls"] = api_pairs_debug
     debug["counts"]["pairs_returned"] = len(all_pairs)
 
-    # Group pairs by token address (base or quote)
+    # Group pairs by token address (base or quote). Lowercased sides are kept per pair object
+    # (all_pairs keeps them alive, so id() stays valid) for the symbol fix in section 4.
     pairs_by_token: Dict[str, List[Dict[str, Any]]] = {}
+    sides_by_pair: Dict[int, Tuple[str, str]] = {}
     for p in all_pairs:
-        base = (p.get("baseToken") or {}).get("address") or ""
-        quote = (p.get("quoteToken") or {}).get("address") or ""
-        base_l = str(base).strip().lower()
-        quote_l = str(quote).strip().lower()
+        base_l, quote_l = sides_by_pair[id(p)] = _pair_sides_lower(p)
         if base_l:
             pairs_by_token.setdefault(base_l, []).append(p)
         if quote_l:
@@ -844,59 +1360,55 @@ def run_scan_for_modes(
     missing = [a for a in token_addrs if a.lower() not in pairs_by_token]
     debug["counts"]["tokens_missing_from_batch"] = len(missing)
 
-    # Only fallback for a small number to avoid hammering the API
-    for a in missing[: min(15, len(missing))]:
-        pairs_fb, dbg_fb = fetch_token_pairs_fallback(CHAIN_ID, a)
-        if dbg_fb.get("status") and dbg_fb.get("status") >= 400:
-            errors.append(f"pairs_fallback {a[:6]}.. status={dbg_fb.get('status')}")
-        if pairs_fb:
-            pairs_by_token.setdefault(a.lower(), []).extend(pairs_fb)
+    # Only fallback for a small number to avoid hammering the API.
+    # One GET per token: run them on a small pool, results handled in token order.
+    fallback = missing[: min(15, len(missing))]
+    if fallback:
+        with ThreadPoolExecutor(max_workers=min(PAIRS_FALLBACK_WORKERS, len(fallback))) as pool:
+            for a, (pairs_fb, dbg_fb) in zip(
+                fallback, pool.map(lambda ta: fetch_token_pairs_fallback(CHAIN_ID, ta), fallback)
+            ):
+                if dbg_fb.get("status") and dbg_fb.get("status") >= 400:
+                    errors.append(f"pairs_fallback {a[:6]}.. status={dbg_fb.get('status')}")
+                if pairs_fb:
+                    pairs_by_token.setdefault(a.lower(), []).extend(pairs_fb)
 
     # -------------------------------------------------------------------------
     # 4) Build best pair per token, compute metrics and score
     # -------------------------------------------------------------------------
-    rows: List[Dict[str, Any]] = []
+    # Eligible (base row, mode) pairs; the base row is shared by all modes of a token and the
+    # output dicts are only built for the ranked survivors
+    eligible: List[Tuple[Dict[str, Any], str]] = []
     done = 0
     total = len(token_addrs)
 
+    # Pass 1: best pair + metrics per token. Tokens without a usable pair keep their slot
+    # (base_row None) so debug entries and progress ticks stay in token order.
+    prepared: List[Tuple[str, Optional[Dict[str, Any]], Optional[PairMetrics], str]] = []
     for token_addr in token_addrs:
         ta_l = token_addr.lower()
         pairs = pairs_by_token.get(ta_l) or []
 
         if not pairs:
-            if opts.verbose_debug:
-                why_filtered_list.append(
-                    {"tokenAddress": token_addr, "reason": "no_pairs_returned"}
-                )
-            done += 1
-            if opts.progress_callback:
-                opts.progress_callback(done, total)
+            prepared.append((token_addr, None, None, "no_pairs_returned"))
             continue
 
-        # pick best pair by liquidity then vol24
-        best = None
-        best_key = (-1.0, -1.0)
-        for p in pairs:
-            liq = _safe_float((p.get("liquidity") or {}).get("usd"))
-            vol24 = _safe_float((p.get("volume") or {}).get("h24"))
-            key = (liq, vol24)
-            if key > best_key:
-                best_key = key
-                best = p
+        # pick best pair by liquidity then vol24 (first one wins on ties)
+        best = max(pairs, key=_pair_liq_vol)
 
         if not best:
-            done += 1
-            if opts.progress_callback:
-                opts.progress_callback(done, total)
+            prepared.append((token_addr, None, None, ""))
             continue
 
-        base = (best.get("baseToken") or {})
-        quote = (best.get("quoteToken") or {})
+        base = (best.get("baseToken") or _EMPTY)
+        quote = (best.get("quoteToken") or _EMPTY)
         symbol = base.get("symbol") or ""
         name = base.get("name") or ""
 
         # If token is quote token, symbol/name might be wrong; fix by checking addresses
-        if str(base.get("address") or "").strip().lower() != ta_l and str(quote.get("address") or "").strip().lower() == ta_l:
+        # (fallback pairs weren't grouped above: compute their sides here)
+        base_l, quote_l = sides_by_pair.get(id(best)) or _pair_sides_lower(best)
+        if base_l != ta_l and quote_l == ta_l:
             symbol = quote.get("symbol") or symbol
             name = quote.get("name") or name
 
@@ -906,10 +1418,11 @@ def run_scan_for_modes(
             "name": name,
         }
 
-        base_row.update(compute_metrics_from_pair(best))
+        metrics = PairMetrics.from_pair(best)
+        base_row.update(metrics.as_dict())
 
         # Merge candidate enrichment fields
-        cand = candidates_by_token.get(ta_l, {})
+        cand = candidates_by_token.get(ta_l, _EMPTY)
         base_row["source"] = cand.get("source") or ""
         base_row["sources"] = cand.get("sources") or [base_row["source"]] if base_row["source"] else []
         base_row["boostAmount"] = _safe_float(cand.get("boostAmount"))
@@ -920,17 +1433,52 @@ def run_scan_for_modes(
         base_row["profileDescription"] = cand.get("profileDescription") or ""
         base_row["profileLinksCount"] = _safe_int(cand.get("profileLinksCount"))
         base_row["urlGMGN"] = f"https://gmgn.ai/sol/token/{token_addr}" if token_addr else ""
+        prepared.append((token_addr, base_row, metrics, ""))
+
+    # Score every prepared row in one vectorized pass
+    score_pairs_batch([br for _, br, _, _ in prepared if br is not None], pump_mode=opts.pump_mode)
+    # Thresholds only depend on (mode, pump_mode): resolve them once for the whole scan
+    # Flat (mode, *thresholds) rows: the mode loop unpacks plain locals instead of reading
+    # NamedTuple attributes for every (token, mode)
+    mode_thresholds = [(mode, *_mode_thresholds(mode, pump_mode=opts.pump_mode)) for mode in opts.selected_modes]
+    anti_dead_pass = _make_anti_dead(opts)
+    trending_reject_mask = _make_trending_reject_mask(opts)
+
+    def _rank_key(r: Dict[str, Any]) -> Tuple[float, float, float]:
+        # Primary: spike_score (or score), then liquidity
+        spike = _safe_float(r.get("spike_score"))
+        score = _safe_float(r.get("score"))
+        liq = _safe_float(r.get("liquidityUsd"))
+        return (spike if opts.sort_by_spike else score, score, liq)
 
-        # Score
-        sc = score_pair(base_row, pump_mode=opts.pump_mode)
-        base_row.update(sc)
+    # unique_per_token: keep only the best row per token while building them.
+    # token -> (rank key, row index, base row, mode); on equal rank the earliest row wins, as with a stable sort.
+    best_per_token: Optional[Dict[str, Tuple[Tuple[float, float, float], int, Dict[str, Any], str]]] = (
+        {} if opts.unique_per_token else None
+    )
+    n_rows = 0
+
+    # Pass 2: filters and mode eligibility
+    for token_addr, base_row, metrics, skip_reason in prepared:
+        if base_row is None or metrics is None:
+            if skip_reason and log_why:
+                why_filtered_list.append(
+                    {"tokenAddress": token_addr, "reason": skip_reason}
+                )
+                log_why = len(why_filtered_list) < WHY_FILTERED_MAX
+            done += 1
+            if opts.progress_callback:
+                opts.progress_callback(done, total)
+            continue
+        symbol = base_row["symbol"]
 
         # Anti-dead (prefilter)
-        if opts.anti_dead and not _anti_dead_pass(base_row, opts):
-            if opts.verbose_debug:
+        if opts.anti_dead and not anti_dead_pass(metrics):
+            if log_why:
                 why_filtered_list.append(
                     {"tokenAddress": token_addr, "symbol": symbol, "reason": "anti_dead"}
                 )
+                log_why = len(why_filtered_list) < WHY_FILTERED_MAX
             done += 1
             if opts.progress_callback:
                 opts.progress_callback(done, total)
@@ -938,93 +1486,97 @@ def run_scan_for_modes(
 
         # Trending filters (optional)
         if opts.trending_filters:
-            reasons = _trending_reasons(base_row, opts)
-            if reasons:
-                if opts.verbose_debug:
+            reject = trending_reject_mask(base_row)
+            if reject:
+                if log_why:
                     why_filtered_list.append(
-                        {"tokenAddress": token_addr, "symbol": symbol, "reason": ",".join(reasons)}
+                        {"tokenAddress": token_addr, "symbol": symbol, "reason": ",".join(_format_reasons(reject, base_row))}
                     )
+                    log_why = len(why_filtered_list) < WHY_FILTERED_MAX
                 done += 1
                 if opts.progress_callback:
                     opts.progress_callback(done, total)
                 continue
 
         # Mode eligibility: a token can qualify for multiple modes
-        for mode in opts.selected_modes:
-            t = _mode_thresholds(mode, pump_mode=opts.pump_mode)
-
-            if _safe_float(base_row.get("liquidityUsd")) < t["min_liq"]:
-                continue
-            if _safe_float(base_row.get("vol5m")) < t["min_vol5"]:
+        liq, vol5, nb5, age = metrics.liquidity_usd, metrics.vol5m, metrics.net_buy5m, metrics.age_min
+        scv = base_row["score"]
+        taken = False
+        for mode, min_liq, min_vol5, min_nb5, max_age, min_score in mode_thresholds:
+            # Reject on "<"/">" (not accept on ">="): a NaN metric is never rejected
+            if liq < min_liq or vol5 < min_vol5 or nb5 < min_nb5 or age > max_age or scv < min_score:
                 continue
-            if _safe_int(base_row.get("netBuy5m")) < int(t["min_netbuy5"]):
-                continue
-            if _safe_float(base_row.get("ageMin")) > t["max_age_min"]:
-                continue
-            if _safe_float(base_row.get("score")) < t["min_score"]:
+
+            n_rows += 1
+            if best_per_token is None:
+                eligible.append((base_row, mode))
                 continue
 
-            row = dict(base_row)
-            row["mode"] = mode
-            rows.append(row)
+            # The rank key doesn't depend on the mode: only the token's first eligible mode
+            # can be its best row (the others tie with it and lose)
+            if taken:
+                continue
+            taken = True
+            k = _rank_key(base_row)
+            ta_l = token_addr.lower()
+            cur = best_per_token.get(ta_l)
+            if cur is None or k > cur[0]:
+                best_per_token[ta_l] = (k, n_rows, base_row, mode)
 
         done += 1
         if opts.progress_callback:
             opts.progress_callback(done, total)
 
-    debug["counts"]["rows_after_filters"] = len(rows)
+    debug["counts"]["rows_after_filters"] = n_rows
 
     if opts.verbose_debug:
-        debug["why_filtered_list"] = why_filtered_list[:400]
+        debug["why_filtered_list"] = why_filtered_list
 
-    if not rows:
+    if not n_rows:
         if errors:
-            debug["errors"] = errors[:50]
+            debug["errors"] = errors[:ERRORS_MAX]
         return [], debug
 
     # -------------------------------------------------------------------------
     # 5) Ranking / dedupe
     # -------------------------------------------------------------------------
-    def _rank_key(r: Dict[str, Any]) -> Tuple[float, float, float]:
-        # Primary: spike_score (or score), then liquidity
-        spike = _safe_float(r.get("spike_score"))
-        score = _safe_float(r.get("score"))
-        liq = _safe_float(r.get("liquidityUsd"))
-        return (spike if opts.sort_by_spike else score, score, liq)
-
-    rows.sort(key=_rank_key, reverse=True)
-
-    if opts.unique_per_token:
-        best_per_token: Dict[str, Dict[str, Any]] = {}
-        for r in rows:
-            ta = (r.get("tokenAddress") or "").lower()
-            if not ta:
-                continue
-            if ta not in best_per_token:
-                best_per_token[ta] = r
-        rows = list(best_per_token.values())
-        rows.sort(key=_rank_key, reverse=True)
-
-    # Trim
-    rows = rows[: max(1, opts.top_n)]
+    # Best top_n by rank (heapq.nlargest == stable sort desc + slice, without sorting everything)
+    if best_per_token is not None:
+        survivors = [
+            (base, mode) for _, _, base, mode in heapq.nlargest(
+                max(1, opts.top_n), best_per_token.values(), key=lambda e: (e[0], -e[1])
+            )
+        ]
+    else:
+        survivors = heapq.nlargest(max(1, opts.top_n), eligible, key=lambda e: _rank_key(e[0]))
+    rows = [{**base, "mode": mode} for base, mode in survivors]
 
     # -------------------------------------------------------------------------
     # 6) Paid orders (dex paid) for finalists only
     # -------------------------------------------------------------------------
     if opts.include_orders:
         orders_dbg: Dict[str, Any] = {}
-        for r in rows:
-            ta = (r.get("tokenAddress") or "").strip()
-            if not ta:
-                continue
-            orders, dbg_o = fetch_orders_for_token(CHAIN_ID, ta)
-            orders_dbg[ta[:6]] = dbg_o
-            r["orders_count"] = len(orders)
-            r["isDexPaid"] = bool(orders)
+        targets = [(r, (r.get("tokenAddress") or "").strip()) for r in rows]
+        targets = [(r, ta) for r, ta in targets if ta]
+
+        def _orders(ta: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+            # One failing token must not cancel the others
+            try:
+                return fetch_orders_for_token(CHAIN_ID, ta)
+            except Exception as e:
+                return [], {"error": repr(e)}
+
+        # One GET per finalist: fetch them concurrently, apply results in row order
+        if targets:
+            with ThreadPoolExecutor(max_workers=min(HTTP_MAX_WORKERS, len(targets))) as pool:
+                for (r, ta), (orders, dbg_o) in zip(targets, pool.map(_orders, [ta for _, ta in targets])):
+                    orders_dbg[ta[:6]] = dbg_o
+                    r["orders_count"] = len(orders)
+                    r["isDexPaid"] = bool(orders)
         debug["api_debug"]["orders"] = orders_dbg
 
     if errors:
-        debug["errors"] = errors[:50]
+        debug["errors"] = errors[:ERRORS_MAX]
 
     return rows, debug
 
@@ -1039,6 +1591,7 @@ def get_candidates_boosts(*, chain_id: str = CHAIN_ID) -> List[Dict[str, Any]]:
     for it in items:
         c = _candidate_from_boost_item(it)
         if c:
+            c.pop("_taLower", None)  # scan-internal key
             out.append(c)
     return out
 
@@ -1049,6 +1602,7 @@ def get_candidates_ads(*, chain_id: str = CHAIN_ID) -> List[Dict[str, Any]]:
     for it in items:
         c = _candidate_from_ad_item(it)
         if c:
+            c.pop("_taLower", None)  # scan-internal key
             out.append(c)
     return out
 
@@ -1073,73 +1627,70 @@ def scan_runners(
     # We cannot directly inject candidates into run_scan_for_modes without changing its signature,
     # so we approximate by re-scoring the best pair for each candidate locally.
     # If you still use this path heavily, prefer migrating to run_scan_for_modes in app.py.
-    token_addrs = [c.get("tokenAddress") for c in candidates if c.get("tokenAddress")]
-    token_addrs = [str(a).strip() for a in token_addrs if str(a).strip()]
+    # Caller-provided candidates may repeat a token (e.g. latest + top boosts)
+    token_addrs = _dedup_ci(str(c.get("tokenAddress") or "") for c in candidates)
     if not token_addrs:
         return []
 
     # Fetch pairs in batch
-    rows: List[Dict[str, Any]] = []
-    all_pairs: List[Dict[str, Any]] = []
-    for ch in _chunks(token_addrs[:300], 30):
-        pairs_chunk, _ = fetch_pairs_for_tokens_batch(CHAIN_ID, ch)
-        all_pairs.extend(pairs_chunk)
+    all_pairs, _ = fetch_pairs_for_tokens_bulk(CHAIN_ID, token_addrs[:300])
 
     pairs_by_token: Dict[str, List[Dict[str, Any]]] = {}
     for p in all_pairs:
-        base = (p.get("baseToken") or {}).get("address") or ""
-        quote = (p.get("quoteToken") or {}).get("address") or ""
+        base = (p.get("baseToken") or _EMPTY).get("address") or ""
+        quote = (p.get("quoteToken") or _EMPTY).get("address") or ""
         if base:
             pairs_by_token.setdefault(base.lower(), []).append(p)
         if quote:
             pairs_by_token.setdefault(quote.lower(), []).append(p)
 
-    # Score and filter using the mode thresholds
+    # Best pair per token, then metrics and scores for all of them at once
+    scored: List[Dict[str, Any]] = []
+    bests: List[Dict[str, Any]] = []
     for ta in token_addrs:
-        pairs = pairs_by_token.get(ta.lower()) or []
+        ta_l = ta.lower()
+        pairs = pairs_by_token.get(ta_l) or []
         if not pairs:
             continue
-        best = max(
-            pairs,
-            key=lambda p: (_safe_float((p.get("liquidity") or {}).get("usd")), _safe_float((p.get("volume") or {}).get("h24"))),
-        )
-        base = (best.get("baseToken") or {})
-        quote = (best.get("quoteToken") or {})
+        best = max(pairs, key=_pair_liq_vol)
+        base = (best.get("baseToken") or _EMPTY)
+        quote = (best.get("quoteToken") or _EMPTY)
         symbol = base.get("symbol") or ""
         name = base.get("name") or ""
-        if str(base.get("address") or "").strip().lower() != ta.lower() and str(quote.get("address") or "").strip().lower() == ta.lower():
+        base_l, quote_l = _pair_sides_lower(best)
+        if base_l != ta_l and quote_l == ta_l:
             symbol = quote.get("symbol") or symbol
             name = quote.get("name") or name
 
-        row = {"tokenAddress": ta, "symbol": symbol, "name": name}
-        row.update(compute_metrics_from_pair(best))
-        row.update(score_pair(row, pump_mode=pump_mode))
+        scored.append({"tokenAddress": ta, "symbol": symbol, "name": name})
+        bests.append(best)
+    for row, metrics in zip(scored, compute_metrics_batch(bests)):
+        row.update(metrics)
+    score_pairs_batch(scored, pump_mode=pump_mode)
 
-        for mode in selected_modes:
-            t = _mode_thresholds(mode, pump_mode=pump_mode)
-            if _safe_float(row.get("liquidityUsd")) < t["min_liq"]:
-                continue
-            if _safe_float(row.get("vol5m")) < t["min_vol5"]:
-                continue
-            if _safe_int(row.get("netBuy5m")) < int(t["min_netbuy5"]):
-                continue
-            if _safe_float(row.get("ageMin")) > t["max_age_min"]:
-                continue
-            if _safe_float(row.get("score")) < t["min_score"]:
+    # Filter using the mode thresholds
+    mode_thresholds = [(mode, *_mode_thresholds(mode, pump_mode=pump_mode)) for mode in selected_modes]
+    per_mode: Dict[str, List[Dict[str, Any]]] = {}
+    for row in scored:
+        liq = _safe_float(row.get("liquidityUsd"))
+        vol5 = _safe_float(row.get("vol5m"))
+        nb5 = _safe_int(row.get("netBuy5m"))
+        age = _safe_float(row.get("ageMin"))
+        scv = _safe_float(row.get("score"))
+        for mode, min_liq, min_vol5, min_nb5, max_age, min_score in mode_thresholds:
+            if liq < min_liq or vol5 < min_vol5 or nb5 < min_nb5 or age > max_age or scv < min_score:
                 continue
-            rr = dict(row)
-            rr["mode"] = mode
-            rows.append(rr)
+            per_mode.setdefault(mode, []).append(row)
+
+    # Take the top_n_per_mode best by mode, then rank the selection globally
+    def _key(r: Dict[str, Any]) -> float:
+        return _safe_float(r.get("spike_score")) if sort_by_spike else _safe_float(r.get("score"))
 
-    # Rank globally; then take top_n_per_mode by mode
-    rows.sort(key=lambda r: (_safe_float(r.get("spike_score")) if sort_by_spike else _safe_float(r.get("score"))), reverse=True)
-    per_mode: Dict[str, List[Dict[str, Any]]] = {}
-    for r in rows:
-        per_mode.setdefault(r.get("mode") or "", []).append(r)
     out: List[Dict[str, Any]] = []
     for m in selected_modes:
-        out.extend((per_mode.get(m) or [])[: max(1, int(top_n_per_mode))])
-    out.sort(key=lambda r: (_safe_float(r.get("spike_score")) if sort_by_spike else _safe_float(r.get("score"))), reverse=True)
+        best = heapq.nlargest(max(1, int(top_n_per_mode)), per_mode.get(m) or [], key=_key)
+        out.extend({**r, "mode": m} for r in best)
+    out.sort(key=_key, reverse=True)
     return out
 
 
@@ -1154,25 +1705,13 @@ def run_connectivity_smoke_test(timeout_s: int = 8) -> Dict[str, Any]:
 
     checks: Dict[str, Any] = {}
 
-    sources: Dict[str, Callable[..., Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = {
-        "token_boosts_latest": fetch_token_boosts_latest,
-        "token_boosts_top": fetch_token_boosts_top,
-        "ads_latest": fetch_ads_latest,
-        "token_profiles_latest": fetch_token_profiles_latest,
-        "community_takeovers_latest": fetch_community_takeovers_latest,
-    }
-
-    for name, func in sources.items():
-        try:
-            data, dbg = func(timeout_s=timeout_s)
-            count = len(data) if isinstance(data, list) else 0
-            checks[name] = {
-                "ok": count > 0,
-                "count": count,
-                "debug": dbg,
-            }
-        except Exception as e:
-            checks[name] = {"ok": False, "count": 0, "error": repr(e)}
+    for name, (data, dbg) in fetch_all_feeds(timeout_s=timeout_s).items():
+        count = len(data) if isinstance(data, list) else 0
+        checks[name] = {
+            "ok": count > 0,
+            "count": count,
+            "debug": dbg,
+        }
 
     return checks
 
@@ -0,0 +1,31 @@
+import time
+import unittest
+from unittest import mock
+
+import paid_runners_bot as bot
+
+
+class UrlCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        bot._URL_CACHE.clear()
+        self.addCleanup(bot._URL_CACHE.clear)
+
+    def test_put_past_limit_evicts_oldest(self) -> None:
+        with mock.patch.object(bot, "URL_CACHE_MAX", 4):
+            for i in range(10):
+                bot._url_cache_put(f"https://x/{i}", (time.monotonic(), i, {}, None))
+        self.assertEqual(len(bot._URL_CACHE), 4)
+        self.assertEqual(list(bot._URL_CACHE), [f"https://x/{i}" for i in range(6, 10)])
+
+    def test_cache_hit_refreshes_lru_position(self) -> None:
+        with mock.patch.object(bot, "URL_CACHE_MAX", 2):
+            bot._url_cache_put("https://x/a", (time.monotonic(), "a", {}, None))
+            bot._url_cache_put("https://x/b", (time.monotonic(), "b", {}, None))
+            data, dbg = bot._http_get_json("https://x/a", ttl_s=60.0)
+            self.assertEqual((data, dbg.get("cache")), ("a", "hit"))
+            bot._url_cache_put("https://x/c", (time.monotonic(), "c", {}, None))
+        self.assertEqual(list(bot._URL_CACHE), ["https://x/a", "https://x/c"])
+
+
+if __name__ == "__main__":
+    unittest.main()